@@ -0,0 +1,175 @@
+"""Admission control for the chat backends.
+
+Three layers, cheapest first:
+- a token bucket per client IP (429 + Retry-After when a client sends too fast),
+- a bulkhead per upstream provider capping concurrent model calls, with a bounded
+  queue and a maximum wait for the rest,
+- load shedding: when a provider's queue is full (or the wait runs out) the call fails
+  fast with Overloaded, which the endpoints turn into 503 + Retry-After.
+Counters for all three are exposed through info().
+"""
+import os
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from metrics import ADMISSION_ACTIVE, ADMISSION_WAITING, ADMISSION_REJECTED
+
+# Concurrent upstream calls allowed per provider
+ADMISSION_CONCURRENCY = {
+    "gemini": int(os.getenv("ADMISSION_GEMINI_CONCURRENCY", "8")),
+    "hf": int(os.getenv("ADMISSION_HF_CONCURRENCY", "4")),
+}
+# Calls allowed to wait for a slot per provider, and for how long (seconds)
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "5"))
+# Per-IP token bucket: sustained requests per minute and burst size (0 = no rate limit)
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+# Use the first X-Forwarded-For address as the client IP (only behind a trusted proxy)
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+# Buckets kept in memory (least recently seen clients are forgotten first)
+RATE_LIMIT_MAX_CLIENTS = 10000
+
+class Overloaded(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class Bulkhead:
+    """Caps concurrent calls to one provider; extra calls wait in a bounded queue"""
+
+    def __init__(self, name: str, limit: int, max_queue: int = ADMISSION_MAX_QUEUE,
+                 max_wait: float = ADMISSION_MAX_WAIT):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        # Smoothed time a call holds its slot, for Retry-After estimates
+        self.avg_hold = 2.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0, "max_waiting": 0}
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained"""
+        backlog = self.waiting + self.active
+        return max(1, min(60, math.ceil(backlog * self.avg_hold / max(self.limit, 1))))
+
+    @property
+    def saturated(self) -> bool:
+        return self.active >= self.limit and self.waiting >= self.max_queue
+
+    @asynccontextmanager
+    async def slot(self):
+        if self.active >= self.limit or self.waiting:
+            if self.waiting >= self.max_queue:
+                self.stats["rejected_queue_full"] += 1
+                ADMISSION_REJECTED.inc(provider=self.name, reason="queue_full")
+                raise Overloaded(f"{self.name} queue full", self.retry_after())
+            self.waiting += 1
+            self.stats["queued"] += 1
+            self.stats["max_waiting"] = max(self.stats["max_waiting"], self.waiting)
+            ADMISSION_WAITING.set(self.waiting, provider=self.name)
+            try:
+                # Not wait_for: before 3.12 it can time out after the acquire succeeded and leak the permit
+                async with asyncio.timeout(self.max_wait):
+                    await self.semaphore.acquire()
+            except TimeoutError:
+                self.stats["rejected_timeout"] += 1
+                ADMISSION_REJECTED.inc(provider=self.name, reason="timeout")
+                raise Overloaded(f"{self.name} busy for {self.max_wait}s", self.retry_after())
+            finally:
+                self.waiting -= 1
+                ADMISSION_WAITING.set(self.waiting, provider=self.name)
+        else:
+            await self.semaphore.acquire()
+
+        self.active += 1
+        self.stats["admitted"] += 1
+        ADMISSION_ACTIVE.set(self.active, provider=self.name)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+            ADMISSION_ACTIVE.set(self.active, provider=self.name)
+            self.avg_hold = 0.8 * self.avg_hold + 0.2 * (time.monotonic() - start)
+
+    def info(self) -> dict:
+        return {**self.stats, "active": self.active, "waiting": self.waiting, "limit": self.limit,
+                "max_queue": self.max_queue, "avg_hold_s": round(self.avg_hold, 3)}
+
+class RateLimiter:
+    """Token bucket per client key"""
+
+    def __init__(self, per_minute: float = RATE_LIMIT_PER_MINUTE, burst: float = RATE_LIMIT_BURST,
+                 max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.stats = {"allowed": 0, "limited": 0}
+
+    def check(self, client: str) -> Optional[int]:
+        """None if the request may proceed, otherwise seconds until it would be allowed"""
+        if self.rate <= 0:
+            return None
+        now = time.monotonic()
+        tokens, last = self.buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        retry_after = None
+        if tokens >= 1:
+            tokens -= 1
+            self.stats["allowed"] += 1
+        else:
+            retry_after = max(1, math.ceil((1 - tokens) / self.rate))
+            self.stats["limited"] += 1
+            ADMISSION_REJECTED.inc(provider="any", reason="rate_limited")
+        self.buckets[client] = (tokens, now)
+        while len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+    def info(self) -> dict:
+        return {**self.stats, "clients": len(self.buckets), "per_minute": self.rate * 60, "burst": self.burst}
+
+class Admission:
+    def __init__(self, providers: dict[str, int] = ADMISSION_CONCURRENCY):
+        self.bulkheads = {name: Bulkhead(name, limit) for name, limit in providers.items()}
+        self.limiter = RateLimiter()
+        self.stats = {"shed": 0}
+
+    def slot(self, provider: str):
+        return self.bulkheads[provider].slot()
+
+    def client_ip(self, request) -> str:
+        if RATE_LIMIT_TRUST_PROXY:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def check_rate(self, request) -> Optional[int]:
+        return self.limiter.check(self.client_ip(request))
+
+    def shed(self, providers: list[str]) -> Optional[int]:
+        """Retry-After seconds if every provider we could use is saturated, else None"""
+        bulkheads = [self.bulkheads[p] for p in providers if p in self.bulkheads]
+        if bulkheads and all(b.saturated for b in bulkheads):
+            self.stats["shed"] += 1
+            ADMISSION_REJECTED.inc(provider="all", reason="shed")
+            return min(b.retry_after() for b in bulkheads)
+        return None
+
+    def info(self) -> dict:
+        return {
+            **self.stats,
+            "providers": {name: b.info() for name, b in self.bulkheads.items()},
+            "rate_limit": self.limiter.info(),
+        }
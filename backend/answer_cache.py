@@ -0,0 +1,182 @@
+"""Answer cache for main_hf chat replies.
+
+In-memory LRU with TTL expiry and a memory cap, plus an optional sqlite tier that
+survives restarts and is shared by every worker process pointed at the same file.
+Entries are keyed on the normalized question and a hash of the full system prompt
+(resume context + project context), so a changed resume or README never serves an old
+answer. The base resume hash is stored alongside each entry so stale rows can be
+dropped from disk in one go when the resume changes. An invalidation bumps a generation
+number stored in the file; other workers see it and drop their memory tier.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Seconds an answer stays valid
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+# Approximate memory cap for the in-memory tier, in bytes
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# Path to a sqlite file for the persistent tier (empty = memory only)
+ANSWER_CACHE_DB = os.getenv("ANSWER_CACHE_DB", "")
+# How often (seconds) to check whether another process invalidated the shared file
+GENERATION_CHECK_INTERVAL = 1.0
+
+# Rough per-entry overhead of the dict/tuple/str objects around a cached answer
+ENTRY_OVERHEAD = 200
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def normalize_message(message: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation so trivial variants share an entry"""
+    message = re.sub(r"\s+", " ", message.strip().lower())
+    return message.rstrip("?!. ")
+
+def cache_key(message: str, system_prompt: str) -> str:
+    return f"{content_hash(system_prompt)[:16]}:{content_hash(normalize_message(message))[:32]}"
+
+class AnswerCache:
+    def __init__(self, ttl: float = ANSWER_CACHE_TTL, max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 max_bytes: int = ANSWER_CACHE_MAX_BYTES, db_path: str = ANSWER_CACHE_DB):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[dict, float, int]] = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+        self.db_path = db_path
+        self._db = None
+        self._db_pid = None
+        self.generation = 0
+        self.generation_checked = 0.0
+        if db_path:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, base_hash TEXT, value TEXT, expires_at REAL)"
+            )
+            self.db.commit()
+            self.generation = self._stored_generation()
+
+    @property
+    def db(self) -> Optional[sqlite3.Connection]:
+        """This process's connection; a forked worker opens its own instead of sharing the parent's"""
+        if not self.db_path:
+            return None
+        if self._db_pid != os.getpid():
+            # WAL lets workers read while another one writes
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _stored_generation(self) -> int:
+        return self.db.execute("PRAGMA user_version").fetchone()[0]
+
+    def _check_generation(self, now: float):
+        """Drop the memory tier if another process invalidated the shared file"""
+        if now - self.generation_checked < GENERATION_CHECK_INTERVAL:
+            return
+        self.generation_checked = now
+        generation = self._stored_generation()
+        if generation != self.generation:
+            self.generation = generation
+            self.entries.clear()
+            self.bytes = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self.lock:
+            if self.db_path:
+                self._check_generation(now)
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at, size = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+                self._remove(key)
+                self.stats["expired"] += 1
+
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT value, expires_at FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._insert(key, value, row[1])
+                    self.stats["disk_hits"] += 1
+                    return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: dict, base_hash: str = ""):
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._insert(key, value, expires_at)
+            self.stats["stores"] += 1
+            if self.db is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO answers (key, base_hash, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, base_hash, json.dumps(value), expires_at),
+                )
+                self.db.commit()
+
+    def invalidate(self, keep_base_hash: Optional[str] = None) -> int:
+        """Drop every entry, or on disk only those built from a different resume context"""
+        with self.lock:
+            removed = len(self.entries)
+            self.entries.clear()
+            self.bytes = 0
+            if self.db is not None:
+                if keep_base_hash is None:
+                    cursor = self.db.execute("DELETE FROM answers")
+                else:
+                    cursor = self.db.execute("DELETE FROM answers WHERE base_hash != ?", (keep_base_hash,))
+                # Everything in memory was also written to disk, so the disk count covers both
+                removed = cursor.rowcount
+                self.db.execute("DELETE FROM answers WHERE expires_at <= ?", (time.time(),))
+                if removed or keep_base_hash is None:
+                    self.generation = self._stored_generation() + 1
+                    self.db.execute(f"PRAGMA user_version = {self.generation}")
+                self.db.commit()
+            return removed
+
+    def info(self) -> dict:
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "hit_rate": round((self.stats["hits"] + self.stats["disk_hits"]) / lookups, 3) if lookups else None,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+                "persistent": bool(self.db_path),
+            }
+
+    def _insert(self, key: str, value: dict, expires_at: float):
+        if key in self.entries:
+            self._remove(key)
+        size = len(key) + len(json.dumps(value)) + ENTRY_OVERHEAD
+        self.entries[key] = (value, expires_at, size)
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
@@ -0,0 +1,61 @@
+"""Embedding throughput, with and without the persistent cache.
+
+Embeds a synthetic README-like corpus three ways and reports chunks/second:
+  baseline  - HuggingFaceEmbeddings with default settings (what get_embeddings used to do)
+  batched   - CachedEmbeddings with an empty cache (first ingest)
+  cached    - CachedEmbeddings again over the same corpus (re-ingest / repeated queries)
+
+Needs the real model (sentence-transformers + network or a local HF cache).
+Usage (from backend/):  python bench/bench_embeddings.py [--chunks 500] [--batch-size 64]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+WORDS = ("model data pipeline python fastapi react nfl xgboost embedding vector index query "
+         "docker deploy training feature latency cache stream token project readme").split()
+
+def corpus(n: int) -> list[str]:
+    rng = random.Random(0)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))) for _ in range(n)]
+
+def rate(fn, texts) -> float:
+    start = time.perf_counter()
+    fn(texts)
+    return round(len(texts) / (time.perf_counter() - start), 1)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from embeddings import CachedEmbeddings
+
+    texts = corpus(args.chunks)
+    baseline = HuggingFaceEmbeddings(model_name=MODEL)
+    baseline.embed_documents(texts[:8])  # load weights before timing
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = HuggingFaceEmbeddings(model_name=MODEL, encode_kwargs={"batch_size": args.batch_size})
+        cached = CachedEmbeddings(model, MODEL, batch_size=args.batch_size, cache_path=os.path.join(tmp, "cache.sqlite"))
+        results = {
+            "chunks": args.chunks,
+            "batch_size": args.batch_size,
+            "baseline_chunks_per_s": rate(baseline.embed_documents, texts),
+            "batched_cold_chunks_per_s": rate(cached.embed_documents, texts),
+            "cached_chunks_per_s": rate(cached.embed_documents, texts),
+            "stats": cached.info(),
+        }
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Microbenchmark for the intent router (no network).
+
+Grows the intent table with synthetic keywords and phrases and times routing a set of
+chat messages with the compiled trie regex, against the old approach of checking every
+term with a substring `in` test. The compiled router should stay nearly flat as the
+table grows; the linear scan grows with it.
+
+Usage (from backend/):  python bench/bench_intents.py [--sizes 100,1000,10000,50000]
+"""
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import IntentRouter, INTENTS_PATH, normalize
+
+MESSAGES = [
+    "hi",
+    "Hello there!",
+    "What programming languages does Dixon know?",
+    "Tell me about his Football AI project and how the XGBoost model was validated",
+    "How can I contact him?",
+    "Where did he go to school and what was his GPA?",
+    "thanks, that was really helpful",
+    "Does he have experience with Azure Container Apps and Power BI dashboards at Nittany AI?",
+]
+
+def synthetic_intents(base: list[dict], size: int, seed: int = 0) -> list[dict]:
+    """The real intents plus `size` random terms spread over 50 extra intents"""
+    rng = random.Random(seed)
+    extra = [{"name": f"synthetic_{i}", "keywords": [], "phrases": [], "response": "", "fast_path": False} for i in range(50)]
+    for n in range(size):
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(rng.randint(1, 3))]
+        intent = extra[n % len(extra)]
+        (intent["keywords"] if len(words) == 1 else intent["phrases"]).append(" ".join(words))
+    return base + extra
+
+def linear_route(intents: list[dict], message: str):
+    """The old main_simple approach: substring checks, first hit wins"""
+    message = message.lower()
+    for intent in intents:
+        for term in intent["keywords"] + intent["phrases"]:
+            if term.rstrip("*") in message:
+                return intent["name"]
+    return None
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in MESSAGES:
+            fn(message)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="0,100,1000,10000,50000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    base = IntentRouter.from_file(INTENTS_PATH)
+    print(f"{'terms':>7} {'compile ms':>11} {'router us/msg':>14} {'linear us/msg':>14}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        intents = synthetic_intents([dict(i) for i in base.intents], size)
+        start = time.perf_counter()
+        router = IntentRouter(intents, list(base.filler), base.fallback)
+        compile_ms = (time.perf_counter() - start) * 1000
+        terms = len(router.exact) + len(router.prefixes)
+        # Put synthetic intents first for the linear scan so common messages can't exit early
+        linear_order = intents[len(base.intents):] + intents[:len(base.intents)]
+        print(f"{terms:>7} {compile_ms:>11.1f} {timed(router.route, args.repeat):>14.1f} "
+              f"{timed(lambda m: linear_route(linear_order, normalize(m)), max(args.repeat // 10, 1)):>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Microbenchmark: sanitizer.py against the old clean_response / StreamCleaner (no network).
+
+Times cleaning the golden-corpus replies (typical, mostly one or two sentences) and a few
+long, realistic replies, both whole and streamed in ~4-character chunks (roughly one
+model token each). Then lists the golden cases the two implementations clean
+differently - notably role labels ("AI:", "User:", "Answer:") in the middle of a line,
+which the old code removed and sanitizer.py keeps.
+
+Usage (from backend/):  python bench/bench_sanitizer.py [--repeat 200]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sanitizer import Sanitizer, clean_response
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sanitizer_golden.json")
+
+# --- The previous implementation from main_hf.py, kept verbatim for comparison ---
+ARTIFACTS_TO_REMOVE = [
+    "[/USER]", "[/INST]", "[INST]", "</s>", "<s>",
+    "[/SYS]", "[SYS]", "<<SYS>>", "<</SYS>>",
+    "Human:", "Assistant:", "User:", "AI:",
+    "ANSWER:", "Answer:", "Response:",
+]
+
+def legacy_clean_response(answer):
+    if not answer:
+        return None
+    answer = answer.strip()
+    for artifact in ARTIFACTS_TO_REMOVE:
+        answer = answer.replace(artifact, "")
+    answer = re.sub(r'Answer this question about Dixon[^:]*:\s*', '', answer, flags=re.IGNORECASE)
+    answer = re.sub(r'\n\s*(what|which|how|where|when|who|why|tell me|describe|explain)[^\n?]*\?\s*\n', '\n', answer, flags=re.IGNORECASE)
+    answer = re.sub(r'\n\s*(what|which|how|where|when|who|why|tell me|describe|explain)[^\n?]*\?\s*$', '', answer, flags=re.IGNORECASE)
+    answer = answer.strip()
+    while answer and answer[0] in '?!.\n\t ':
+        answer = answer[1:].strip()
+    answer = re.sub(r'\n{3,}', '\n\n', answer)
+    answer = answer.strip()
+    return answer if len(answer) > 10 else None
+
+class LegacyStreamCleaner:
+    HOLDBACK = max(len(a) for a in ARTIFACTS_TO_REMOVE) - 1
+
+    def __init__(self):
+        self.buffer = ""
+        self.started = False
+
+    def _scrub(self, text):
+        for artifact in ARTIFACTS_TO_REMOVE:
+            text = text.replace(artifact, "")
+        if not self.started:
+            text = text.lstrip('?!.\n\t ')
+        return text
+
+    def feed(self, chunk):
+        self.buffer = self._scrub(self.buffer + chunk)
+        if len(self.buffer) <= self.HOLDBACK:
+            return ""
+        out, self.buffer = self.buffer[:-self.HOLDBACK], self.buffer[-self.HOLDBACK:]
+        self.started = True
+        return out
+
+    def flush(self):
+        out, self.buffer = self._scrub(self.buffer).rstrip(), ""
+        return out
+
+LONG_REPLY = (
+    "Dixon Zor is a Computer Science graduate from Pennsylvania State University (May 2025). "
+    "He currently works as an AI Application Specialist at the Penn State Nittany AI Alliance, where he "
+    "architected automated student analytics dashboards with Azure Container Apps and Power BI.\n\n"
+    "Some highlights:\n"
+    "  - Engineered internal frameworks for RAG and Context-Augmented Generation\n"
+    "  - Automated cross-cloud infrastructure (AWS, Azure, GCP) with a custom Python CLI\n"
+    "  - Built an AI-driven code review system that cut manual review time by 50%\n\n"
+    "Outside of work he builds projects like Football-Ai, a stacked XGBoost ensemble for fantasy football, "
+    "and makes YouTube videos about NFL analytics. He also enjoys the gym."
+)
+
+def golden() -> list[dict]:
+    with open(GOLDEN, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+LONG_REPLIES = [LONG_REPLY, "Assistant: " + LONG_REPLY + "\nWhat else does he do?</s>", LONG_REPLY * 3]
+
+def per_reply_us(fn, replies, repeat) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for reply in replies:
+            fn(reply)
+    return (time.perf_counter() - start) / (repeat * len(replies)) * 1e6
+
+def stream_new(reply):
+    sanitizer = Sanitizer()
+    for i in range(0, len(reply), 4):
+        sanitizer.feed(reply[i:i + 4])
+    sanitizer.finish()
+
+def stream_legacy(reply):
+    cleaner = LegacyStreamCleaner()
+    for i in range(0, len(reply), 4):
+        cleaner.feed(reply[i:i + 4])
+    cleaner.flush()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = golden()
+    typical = [case["input"] for case in cases]
+    print(f"{'':<28} {'old us/reply':>13} {'new us/reply':>13}")
+    for label, subset in (("whole, typical replies", typical), ("whole, long replies", LONG_REPLIES)):
+        print(f"{label:<28} {per_reply_us(legacy_clean_response, subset, args.repeat):>13.1f} "
+              f"{per_reply_us(clean_response, subset, args.repeat):>13.1f}")
+    for label, subset in (("streamed, typical replies", typical), ("streamed, long replies", LONG_REPLIES)):
+        print(f"{label:<28} {per_reply_us(stream_legacy, subset, args.repeat):>13.1f} "
+              f"{per_reply_us(stream_new, subset, args.repeat):>13.1f}")
+
+    print("\nGolden cases cleaned differently (old -> new):")
+    for case in cases:
+        old, new = legacy_clean_response(case["input"]), clean_response(case["input"])
+        if old != new:
+            print(f"  {case['name']}: {old!r} -> {new!r}")
+
+if __name__ == "__main__":
+    main()
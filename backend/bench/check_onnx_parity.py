@@ -0,0 +1,72 @@
+"""Check that the ONNX embedding backend matches sentence-transformers.
+
+Embeds a set of portfolio-style texts with both backends and fails (exit 1) if any
+pair's cosine similarity drops below the tolerance. Also prints import time, model load
+time and per-query latency for each backend. Needs both backends installed and the
+model files available.
+
+Usage (from backend/):  python bench/check_onnx_parity.py [--onnx-file onnx/model.onnx] [--tolerance 0.99]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+TEXTS = [
+    "What projects has Dixon built?",
+    "Stacked XGBoost ensemble predicting NFL player performance with walk-forward validation.",
+    "Project: Video Truncator\nDesc: Removes silences from raw footage\nReadme: Built with ffmpeg and FastAPI.",
+    "Dixon is an AI Application Specialist at the Penn State Nittany AI Alliance.",
+    "hello",
+    "A very long README paragraph " * 60,
+]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round((time.perf_counter() - start) * 1000, 1)
+
+def query_latency_ms(model) -> float:
+    model.embed_query("warm up")
+    start = time.perf_counter()
+    for _ in range(20):
+        model.embed_query("What did Dixon build with FastAPI?")
+    return round((time.perf_counter() - start) / 20 * 1000, 2)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--onnx-file", default=os.getenv("EMBED_ONNX_FILE", "onnx/model.onnx"))
+    parser.add_argument("--tolerance", type=float, default=0.99)
+    args = parser.parse_args()
+
+    _, onnx_import_ms = timed(lambda: __import__("onnx_embeddings"))
+    from onnx_embeddings import OnnxEmbeddings
+    onnx_model, onnx_load_ms = timed(lambda: OnnxEmbeddings(MODEL, onnx_file=args.onnx_file))
+
+    _, hf_import_ms = timed(lambda: __import__("langchain_huggingface"))
+    from langchain_huggingface import HuggingFaceEmbeddings
+    hf_model, hf_load_ms = timed(lambda: HuggingFaceEmbeddings(model_name=MODEL))
+
+    a = np.asarray(hf_model.embed_documents(TEXTS))
+    b = np.asarray(onnx_model.embed_documents(TEXTS))
+    cosines = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+    report = {
+        "onnx_file": args.onnx_file,
+        "min_cosine": round(float(cosines.min()), 5),
+        "tolerance": args.tolerance,
+        "passed": bool(cosines.min() >= args.tolerance),
+        "hf": {"import_ms": hf_import_ms, "load_ms": hf_load_ms, "query_ms": query_latency_ms(hf_model)},
+        "onnx": {"import_ms": onnx_import_ms, "load_ms": onnx_load_ms, "query_ms": query_latency_ms(onnx_model)},
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+if __name__ == "__main__":
+    main()
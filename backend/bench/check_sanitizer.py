@@ -0,0 +1,58 @@
+"""Golden tests for sanitizer.py (no network).
+
+Every case in fixtures/sanitizer_golden.json must come out exactly as expected, both
+when the reply is cleaned in one go and when it is fed in chunks - one character at a
+time, every two-way split, and random chunk sizes - so artifacts split across stream
+chunks are caught too. Exits non-zero on any mismatch.
+
+Usage (from backend/):  python bench/check_sanitizer.py
+"""
+import os
+import sys
+import json
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sanitizer import Sanitizer, sanitize
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sanitizer_golden.json")
+
+def streamed(chunks: list[str]) -> str:
+    sanitizer = Sanitizer()
+    return "".join(sanitizer.feed(chunk) for chunk in chunks) + sanitizer.finish()
+
+def chunkings(text: str, rng: random.Random):
+    yield "one char", list(text)
+    for cut in range(1, len(text)):
+        yield f"split at {cut}", [text[:cut], text[cut:]]
+    for attempt in range(20):
+        chunks, i = [], 0
+        while i < len(text):
+            size = rng.randint(1, 12)
+            chunks.append(text[i:i + size])
+            i += size
+        yield f"random #{attempt}", chunks
+
+def main():
+    with open(GOLDEN, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    rng = random.Random(0)
+    failures = 0
+    for case in cases:
+        got = sanitize(case["input"])
+        if got != case["expected"]:
+            failures += 1
+            print(f"FAIL {case['name']}: expected {case['expected']!r}, got {got!r}")
+            continue
+        for label, chunks in chunkings(case["input"], rng):
+            got = streamed(chunks)
+            if got != case["expected"]:
+                failures += 1
+                print(f"FAIL {case['name']} ({label}): expected {case['expected']!r}, got {got!r}")
+                break
+    print(f"{len(cases) - failures}/{len(cases)} golden cases pass (whole and chunked)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
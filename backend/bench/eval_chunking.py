@@ -0,0 +1,113 @@
+"""Compare the markdown-aware chunker with the old character splitter (no API keys needed).
+
+Chunks a set of READMEs both ways and reports chunk counts and retrieval hit-rate: for
+each question, whether the top-k retrieved chunks contain every fact a good answer
+needs. Retrieval is BM25 by default (fully offline); --dense ranks by cosine similarity
+with the ONNX MiniLM model that main.py uses (needs the model files, see EMBED_ONNX_DIR).
+
+Usage (from backend/):  python bench/eval_chunking.py [--k 3] [--dense] [--snapshot data/github_snapshot.json]
+"""
+import os
+import sys
+import json
+import glob
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_assembler import ContextAssembler, Unit, count_tokens, terms
+from ingestion import build_chunks
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "readmes")
+
+# (question, facts that must appear in the retrieved chunks)
+CASES = [
+    ("What model does Football-Ai use?", ["Stacked XGBoost Ensemble"]),
+    ("How is the fantasy football model validated?", ["Walk-Forward Validation"]),
+    ("How accurate are the fantasy projections?", ["4.1 points"]),
+    ("Where does the football data come from?", ["nflverse"]),
+    ("What features does the football model use?", ["red-zone touches"]),
+    ("How does the video truncator detect silence?", ["WebRTC VAD"]),
+    ("Does the video tool re-encode the video?", ["concat demuxer"]),
+    ("Why did Dixon build the video truncator?", ["YouTube"]),
+    ("What vector database does the chatbot use?", ["Chroma"]),
+    ("How does the chatbot re-rank results?", ["cross-encoder"]),
+    ("How well does the LLM chatbot answer questions?", ["87%"]),
+    ("Which LLM generates the chatbot's answers?", ["Mistral-7B-Instruct"]),
+]
+
+def load_fixtures() -> tuple[dict, list[dict]]:
+    data = {"user": {"name": "Dixon Zor", "bio": "CS grad building ML and web projects."}}
+    roster = []
+    for index, path in enumerate(sorted(glob.glob(os.path.join(FIXTURES, "*.md")))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r", encoding="utf-8") as f:
+            data[f"P{index}"] = {"description": "", "object": {"text": f.read()}}
+        roster.append({"position": f"P{index}", "repo_name": name, "display_name": name.replace("-", " ")})
+    return data, roster
+
+def load_snapshot(path: str) -> tuple[dict, list[dict]]:
+    """Real READMEs from the GitHub snapshot (chunk counts only; CASES are written for the fixtures)"""
+    with open(path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    data = {"user": snapshot.get("user") or {"name": "", "bio": ""}}
+    roster = []
+    for index, repo in enumerate(snapshot.get("repos", {}).values()):
+        data[f"P{index}"] = {"description": repo.get("description"), "object": {"text": repo.get("readme", "")}}
+        roster.append({"position": f"P{index}", "repo_name": repo["name"], "display_name": repo["name"]})
+    return data, roster
+
+def bm25_retriever(texts: list[str]):
+    units = [Unit(heading="", entry="", text=text, order=i) for i, text in enumerate(texts)]
+    for unit in units:
+        unit.terms = Counter(terms(unit.text))
+    assembler = ContextAssembler(units)
+    return lambda question, k: [texts[i] for _, i in sorted(
+        ((-score, i) for i, score in enumerate(assembler.score(question))))[:k]]
+
+def dense_retriever(texts: list[str]):
+    import numpy as np
+    from onnx_embeddings import OnnxEmbeddings
+
+    model = OnnxEmbeddings("sentence-transformers/all-MiniLM-L6-v2")
+    matrix = np.asarray(model.embed_documents(texts))
+    return lambda question, k: [texts[i] for i in np.argsort(-(matrix @ np.asarray(model.embed_query(question))))[:k]]
+
+def evaluate(texts: list[str], make_retriever, k: int) -> tuple[float, list[str]]:
+    retrieve = make_retriever(texts)
+    misses = []
+    for question, facts in CASES:
+        context = "\n".join(retrieve(question, k))
+        if not all(fact in context for fact in facts):
+            misses.append(question)
+    return 1 - len(misses) / len(CASES), misses
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--dense", action="store_true", help="rank with ONNX MiniLM embeddings instead of BM25")
+    parser.add_argument("--snapshot", help="GitHub snapshot to report chunk counts for, instead of the fixtures")
+    args = parser.parse_args()
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    data, roster = load_snapshot(args.snapshot) if args.snapshot else load_fixtures()
+    variants = {
+        "character (500/50)": build_chunks(data, roster, RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)),
+        "markdown-aware": build_chunks(data, roster),
+    }
+
+    print(f"{'splitter':<20} {'chunks':>7} {'tokens':>7}" + ("" if args.snapshot else f" {'hit@' + str(args.k):>7}"))
+    for name, chunks in variants.items():
+        texts = [text for _, text, _ in chunks]
+        line = f"{name:<20} {len(texts):>7} {sum(count_tokens(t) for t in texts):>7}"
+        if not args.snapshot:
+            hit_rate, misses = evaluate(texts, dense_retriever if args.dense else bm25_retriever, args.k)
+            line += f" {hit_rate:>7.2f}"
+            for question in misses:
+                line += f"\n    miss: {question}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Offline eval for relevance-selected prompts (no API keys or network needed).
+
+For each question, checks that the facts a good answer needs are still present in the
+assembled context, and compares its size with the full-resume prompt. Answer quality can
+only hold if the facts survive selection, so fact recall is the number to watch.
+
+Usage (from backend/):  python bench/eval_context.py [--budget 550]
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_assembler import ContextAssembler, count_tokens, split_sections
+
+# (question, facts that must appear in the context for a correct answer)
+CASES = [
+    ("What gym does he like?", ["Gym", "enjoys the gym"]),
+    ("What programming languages does Dixon know?", ["JavaScript", "Python", "C++"]),
+    ("Where did he go to school?", ["Pennsylvania State University", "Computer Science"]),
+    ("When did he graduate?", ["May 2025"]),
+    ("Tell me about his XGBoost project", ["Stacked XGBoost Ensemble", "Walk-Forward Validation"]),
+    ("What does he do at the Nittany AI Alliance?", ["AI Application Specialist", "Power BI"]),
+    ("Has he published any research?", ["American Society for Engineering Education"]),
+    ("What cloud platforms has he used?", ["AWS", "Azure", "GCP"]),
+    ("Does he make videos?", ["YouTube", "football analytics"]),
+    ("What computer vision work has he done?", ["Grounding DINO", "SAM 2.1"]),
+    ("What frameworks does he use?", ["React", "Next.js"]),
+    ("How did he get into computers?", ["problem solving"]),
+    ("Has he worked on video tools?", ["ffmpeg", "truncates silences"]),
+    ("What did he do in the research lab?", ["Minecraft Malmo", "ACT-R"]),
+    ("How can I contact Dixon?", ["dixonzor@gmail.com"]),
+]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=int(os.getenv("CONTEXT_TOKEN_BUDGET", "550")))
+    args = parser.parse_args()
+
+    import main_hf
+
+    assembler = ContextAssembler(
+        split_sections(f"{main_hf.RESUME_CONTENT}\n\nABOUT DIXON\n{main_hf.ABOUT_DIXON}", always_include=("EDUCATION",))
+    )
+    full_tokens = count_tokens(main_hf.DIXON_CONTEXT)
+
+    rows = []
+    found_total = facts_total = 0
+    for question, facts in CASES:
+        background = assembler.assemble(question, args.budget)
+        prompt = f"{main_hf.PROMPT_INTRO}\n\n{background}\n\n{main_hf.PROMPT_RULES}"
+        found = [fact for fact in facts if fact in prompt]
+        found_total += len(found)
+        facts_total += len(facts)
+        rows.append({
+            "question": question,
+            "tokens": count_tokens(prompt),
+            "fact_recall": round(len(found) / len(facts), 2),
+            "missing": [fact for fact in facts if fact not in found],
+        })
+
+    avg_tokens = sum(r["tokens"] for r in rows) / len(rows)
+    print(json.dumps({
+        "budget": args.budget,
+        "full_prompt_tokens": full_tokens,
+        "avg_prompt_tokens": round(avg_tokens, 1),
+        "prompt_reduction": round(1 - avg_tokens / full_tokens, 3),
+        "fact_recall": round(found_total / facts_total, 3),
+        "cases": rows,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
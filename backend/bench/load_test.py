@@ -0,0 +1,337 @@
+"""Offline load test for main_hf.py and main.py (no network, no API keys).
+
+Starts bench/stubs.py and each backend as subprocesses (the backends use their real
+client libraries, pointed at the stand-ins through env), drives them with an async load
+generator and prints a JSON report: p50/p95/p99/max latency, throughput and status codes
+per scenario, time-to-first-token for streaming, and event-loop lag read from each
+backend's /metrics histogram over the scenario.
+
+Scenarios:
+    main_hf  chat         POST /api/chat, unique questions (every request reaches a model)
+    main_hf  chat_cached  POST /api/chat, a small repeated set (answer cache + coalescing)
+    main_hf  stream       POST /api/chat/stream (TTFT and full-stream latency)
+    main     ingest       POST /api/ingest?full=true, polled until done (single run)
+    main     chat         POST /api/chat (retrieval + LLM)
+
+A closed loop (--concurrency workers back to back) is the default; --rate switches to an
+open loop with fixed arrivals per second, so queueing shows up in the latency.
+--baseline compares against an earlier report and exits 1 if a p95 or throughput moved
+by more than --max-regression.
+
+Usage (from backend/):
+    python bench/load_test.py --requests 200 --concurrency 16 --out bench_results.json
+    python bench/load_test.py --targets main_hf --latency gemini=800 --error-rate gemini=0.1
+    python bench/load_test.py --baseline bench_results.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Optional
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from stubs import add_arguments, service_env
+
+TOPICS = ["experience", "education", "skills", "projects", "Football AI", "the video truncator",
+          "Nittany AI", "cloud work", "machine learning", "NFL analytics"]
+LAG_METRIC = "portfolio_event_loop_lag_seconds_bucket"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+def summarize(latencies: list[float]) -> dict:
+    return {
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "p99": percentile(latencies, 99),
+        "max": round(max(latencies), 1) if latencies else None,
+        "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+    }
+
+def question(i: int, tag: Optional[str] = None) -> str:
+    """Questions rotate through TOPICS; a tag makes each one unique (so it misses the answer cache)"""
+    topic = TOPICS[i % len(TOPICS)]
+    return f"What can you tell me about Dixon's {topic}? ({tag} #{i})" if tag else f"What can you tell me about Dixon's {topic}?"
+
+# --- processes ---
+
+def start_process(args: list[str], env: dict, cwd: str, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(args, env={**os.environ, **env}, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+
+async def wait_until_up(url: str, process: subprocess.Popen, log_path: str, timeout: float = 60.0,
+                        ready: bool = False):
+    """Wait for any answer from `url`, or with ready=True for a 200 (a readiness probe)"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"{url} exited early, see {log_path}")
+            try:
+                response = await client.get(url, timeout=1.0)
+                if not ready or response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s, see {log_path}")
+
+def stop(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+# --- event loop lag from /metrics ---
+
+async def lag_buckets(client: httpx.AsyncClient) -> dict[str, float]:
+    text = (await client.get("/metrics")).text
+    return {m.group(1): float(m.group(2))
+            for m in re.finditer(rf'^{LAG_METRIC}{{le="([^"]+)"}} (\S+)$', text, re.M)}
+
+def lag_summary(before: dict, after: dict) -> dict:
+    """Percentiles (bucket upper bounds, ms) of the lag samples taken between two scrapes"""
+    bounds = sorted(after, key=lambda le: float("inf") if le == "+Inf" else float(le))
+    cumulative = [(le, after[le] - before.get(le, 0)) for le in bounds]
+    total = cumulative[-1][1] if cumulative else 0
+    if not total:
+        return {"samples": 0}
+
+    def upper(q: float):
+        for le, count in cumulative:
+            if count >= q * total:
+                return le if le == "+Inf" else round(float(le) * 1000, 1)
+
+    return {"samples": int(total), "p50_le": upper(0.5), "p95_le": upper(0.95), "p99_le": upper(0.99),
+            "max_le": upper(1.0)}
+
+# --- load generator ---
+
+async def run_load(client: httpx.AsyncClient, send, requests: int, concurrency: int, rate: float) -> dict:
+    """Call `send(client, i)` `requests` times; it returns (status, ttft_ms or None)"""
+    latencies, ttfts, statuses = [], [], {}
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            status, ttft = await send(client, i)
+        except httpx.HTTPError as e:
+            errors += 1
+            statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            return
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+            if ttft is not None:
+                ttfts.append(ttft)
+
+    start = time.perf_counter()
+    if rate > 0:
+        # Open loop: arrivals on a fixed schedule whatever the response times
+        tasks = []
+        for i in range(requests):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i)))
+        await asyncio.gather(*tasks)
+    else:
+        counter = iter(range(requests))
+
+        async def worker():
+            for i in counter:
+                await one(i)
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "requests": requests, "ok": len(latencies), "statuses": statuses, "transport_errors": errors,
+        "duration_s": round(elapsed, 2), "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms": summarize(latencies),
+    }
+    if ttfts:
+        report["ttft_ms"] = summarize(ttfts)
+    return report
+
+def chat(tag: Optional[str]):
+    async def send(client: httpx.AsyncClient, i: int):
+        response = await client.post("/api/chat", json={"message": question(i, tag)})
+        # main_hf reports "all models failed" in a 200 body
+        if response.status_code == 200 and "error" in response.json():
+            return "model_error", None
+        return response.status_code, None
+    return send
+
+async def send_stream(client: httpx.AsyncClient, i: int):
+    start = time.perf_counter()
+    ttft, outcome = None, None
+    async with client.stream("POST", "/api/chat/stream", json={"message": question(i, "stream")}) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        async for line in response.aiter_lines():
+            if line.startswith("event: token") and ttft is None:
+                ttft = (time.perf_counter() - start) * 1000
+            elif line.startswith("event: "):
+                outcome = line[len("event: "):]
+    return (200 if outcome == "done" else f"stream_{outcome}"), ttft
+
+async def run_ingest(client: httpx.AsyncClient) -> dict:
+    start = time.perf_counter()
+    job = (await client.post("/api/ingest", params={"full": "true"})).json()
+    while job.get("status") in ("queued", "running"):
+        await asyncio.sleep(0.2)
+        job = (await client.get(f"/api/ingest/{job['job_id']}")).json()
+    return {"status": job.get("status"), "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            "counts": job.get("counts"), "timings_ms": job.get("timings_ms"), "error": job.get("error")}
+
+# --- targets ---
+
+async def measure(client: httpx.AsyncClient, name: str, coro) -> dict:
+    before = await lag_buckets(client)
+    result = await coro
+    result["event_loop_lag_ms"] = lag_summary(before, await lag_buckets(client))
+    print(f"  {name}: {json.dumps({k: result[k] for k in result if k in ('ok', 'throughput_rps', 'latency_ms', 'status', 'duration_ms')})}",
+          file=sys.stderr)
+    return result
+
+async def bench_target(target: str, env: dict, args, workdir: str) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    app = {"main_hf": "main_hf:app", "main": "main:app" if args.real_embeddings else "offline_main:app"}[target]
+    log_path = os.path.join(workdir, f"{target}.log")
+    process = start_process(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning",
+         "--app-dir", BENCH_DIR if app.startswith("offline_main") else BACKEND_DIR],
+        env, BACKEND_DIR, log_path,
+    )
+    results = {}
+    try:
+        if target == "main":
+            # Chat answers 503 until prewarm has loaded every model
+            await wait_until_up(f"{base_url}/ready", process, log_path, ready=True)
+        else:
+            await wait_until_up(f"{base_url}/", process, log_path)
+        limits = httpx.Limits(max_connections=max(args.concurrency, 1) * 2)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            print(f"[{target}]", file=sys.stderr)
+            if target == "main_hf":
+                scenarios = {
+                    "chat": chat(tag="chat"),
+                    "chat_cached": chat(tag=None),
+                    "stream": send_stream,
+                }
+            else:
+                results["ingest"] = await measure(client, "ingest", run_ingest(client))
+                scenarios = {"chat": chat(tag="chat")}
+            for name, send in scenarios.items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                results[name] = await measure(
+                    client, name, run_load(client, send, args.requests, args.concurrency, args.rate))
+    finally:
+        stop(process)
+    return results
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Scenarios whose p95 latency grew, or throughput fell, by more than max_regression"""
+    problems = []
+    for target, scenarios in baseline.get("results", {}).items():
+        for name, old in scenarios.items():
+            new = report["results"].get(target, {}).get(name)
+            if not new or "latency_ms" not in old:
+                continue
+            old_p95, new_p95 = old["latency_ms"]["p95"], new["latency_ms"]["p95"]
+            if old_p95 and new_p95 and new_p95 > old_p95 * (1 + max_regression):
+                problems.append(f"{target}/{name}: p95 {old_p95} -> {new_p95} ms")
+            if old["throughput_rps"] and new["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+                problems.append(f"{target}/{name}: throughput {old['throughput_rps']} -> {new['throughput_rps']} rps")
+    return problems
+
+async def run(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="portfolio-bench-")
+    stub_port = free_port()
+    stub_url = f"http://127.0.0.1:{stub_port}"
+    stub_log = os.path.join(workdir, "stubs.log")
+    stub_args = [sys.executable, os.path.join(BENCH_DIR, "stubs.py"), "--port", str(stub_port),
+                 "--latency", args.latency, "--error-rate", args.error_rate, "--seed", str(args.seed),
+                 "--stream-chunks", str(args.stream_chunks), "--chunk-delay", str(args.chunk_delay)]
+    stubs = start_process(stub_args, {}, BACKEND_DIR, stub_log)
+
+    env = {
+        **service_env(stub_url),
+        # Isolated state: no caches or indexes carried over between runs
+        "ANSWER_CACHE_DB": "",
+        "EMBED_CACHE_PATH": "",
+        "GITHUB_SNAPSHOT_PATH": os.path.join(workdir, "github_snapshot.json"),
+        "INGEST_MANIFEST_PATH": os.path.join(workdir, "ingest_manifest.json"),
+        "LEXICAL_INDEX_PATH": os.path.join(workdir, "lexical_index.json"),
+        "PROJECT_REFRESH_INTERVAL": "0",
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "LOG_LEVEL": "WARNING",
+        **dict(item.split("=", 1) for item in args.env),
+    }
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("baseline", "out")}, "results": {}}
+    try:
+        await wait_until_up(f"{stub_url}/stub/stats", stubs, stub_log)
+        for target in args.targets:
+            report["results"][target] = await bench_target(target, env, args, workdir)
+        async with httpx.AsyncClient() as client:
+            report["stubs"] = (await client.get(f"{stub_url}/stub/stats")).json()
+    finally:
+        stop(stubs)
+    report["logs"] = workdir
+    return report
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", nargs="+", default=["main_hf", "main"], choices=["main_hf", "main"])
+    parser.add_argument("--scenarios", nargs="*", help="only run these scenarios (chat, chat_cached, stream)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, default=0.0, help="open-loop arrivals per second (0 = closed loop)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--env", nargs="*", default=[], help="extra KEY=VALUE env for the backends")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="run main.py with its configured embedding model (weights must be cached locally)")
+    parser.add_argument("--out", help="also write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
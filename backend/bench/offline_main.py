@@ -0,0 +1,35 @@
+"""main.py's app with a hashing embedder, for load tests without model weights.
+
+The embedding model is downloaded from the HuggingFace hub on first use, which an offline
+benchmark can't do. This module swaps in a deterministic bag-of-words hashing embedder
+(same interface, same 384 dimensions) before the app starts; everything else - Pinecone,
+the LLM, GitHub - is the real code talking to bench/stubs.py. Use main:app directly (the
+load test's --real-embeddings) when the model is cached locally.
+"""
+import os
+import sys
+import math
+import hashlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from context_assembler import terms
+
+DIMENSION = 384
+
+class HashingEmbeddings:
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * DIMENSION
+        for term in terms(text):
+            digest = hashlib.md5(term.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % DIMENSION] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+main._embeddings = HashingEmbeddings()
+main.readiness.mark_ready("embeddings")
+app = main.app
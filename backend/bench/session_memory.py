@@ -0,0 +1,91 @@
+"""Memory and speed of the chat session store (session_store.py).
+
+Fills a SessionStore with --sessions sessions of --turns turns each (realistic question
+and answer lengths) and reports the memory tracemalloc sees against the store's own
+estimate (which drives SESSION_MAX_BYTES eviction), bytes per session, the size of the
+history each prompt would carry, and the cost of append() / history().
+
+Usage (from backend/):
+    python bench/session_memory.py --sessions 10000 --turns 8
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from session_store import SessionStore
+from context_assembler import count_tokens
+
+QUESTIONS = [
+    "What projects has Dixon built with machine learning?",
+    "Tell me more about the NFL player projection model",
+    "Which technologies did he use for that one?",
+    "How does the video truncator decide what to cut?",
+    "What was his role at the Nittany AI Alliance?",
+    "Does he have experience deploying models to production?",
+]
+
+def answer(rng: random.Random) -> str:
+    sentences = [
+        "Dixon built a stacked XGBoost model that projects weekly fantasy points for NFL players.",
+        "It combines play-by-play features with injury reports and Vegas lines.",
+        "The video tool detects silences with an energy threshold and trims them with ffmpeg.",
+        "At the Nittany AI Alliance he works as an AI Application Specialist on student-facing tools.",
+        "The portfolio chatbot answers questions about his resume and projects with Gemini.",
+        "He has deployed FastAPI services in Docker behind a Cloudflare tunnel.",
+    ]
+    return " ".join(rng.sample(sentences, rng.randint(2, 5)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Caps out of the way: this measures what the sessions themselves cost
+    store = SessionStore(max_sessions=args.sessions, max_bytes=1 << 40, db_path="")
+    turns = [(f"s{i:06d}", rng.choice(QUESTIONS), answer(rng)) for i in range(args.sessions) for _ in range(args.turns)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for session_id, question, reply in turns:
+        store.append(session_id, question, reply)
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    # Timed separately: tracemalloc slows every allocation down
+    timed = SessionStore(max_sessions=args.sessions, max_bytes=1 << 40, db_path="")
+    start = time.perf_counter()
+    for session_id, question, reply in turns:
+        timed.append(session_id, question, reply)
+    append_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    histories = [store.history(f"s{i:06d}") for i in range(args.sessions)]
+    history_s = time.perf_counter() - start
+    tokens = sorted(count_tokens(history) for history in histories)
+
+    info = store.info()
+    print(json.dumps({
+        "sessions": info["sessions"],
+        "turns_per_session": args.turns,
+        "traced_bytes": traced,
+        "estimated_bytes": info["bytes"],
+        "bytes_per_session": round(traced / max(info["sessions"], 1)),
+        "estimate_error": round(info["bytes"] / traced - 1, 3) if traced else None,
+        "rollups": info["rollups"],
+        "history_tokens": {"p50": tokens[len(tokens) // 2], "max": tokens[-1],
+                           "budget": info["history_tokens"] + info["summary_tokens"]},
+        "append_us": round(append_s / len(turns) * 1e6, 1),
+        "history_us": round(history_s / args.sessions * 1e6, 1),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
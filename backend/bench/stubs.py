@@ -0,0 +1,295 @@
+"""Local stand-ins for the GitHub GraphQL, Gemini, HuggingFace and Pinecone APIs.
+
+One FastAPI app serves all four on a single port, speaking just enough of each wire
+format for the real client libraries (requests, google-genai, huggingface_hub, pinecone)
+to work against it:
+
+    POST /graphql                                    GitHub GraphQL (profile, heads, READMEs)
+    POST /v1beta/models/{model}:generateContent      Gemini
+    POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+    POST /v1/chat/completions                        HF (OpenAI-compatible, stream or not)
+    GET  /indexes/{name}                             Pinecone control plane
+    POST /query, /vectors/upsert, /vectors/delete    Pinecone data plane (in-memory)
+
+Each service gets a median latency (log-normal, so there is a tail), an error rate, and
+for the LLMs a number of streamed chunks with a delay between them. Point the backends at
+it with the env printed by `service_env()`.
+
+Usage (from backend/):  python bench/stubs.py --port 9100 --latency gemini=400,hf=900 --error-rate hf=0.1
+"""
+import os
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "readmes")
+SERVICES = ("github", "gemini", "hf", "pinecone")
+# Status returned for injected errors, the way each API reports overload
+ERROR_STATUS = {"github": 502, "gemini": 429, "hf": 503, "pinecone": 500}
+
+ANSWER = (
+    "Dixon is a Computer Science graduate from Penn State who works as an AI Application Specialist "
+    "at the Nittany AI Alliance. He built a stacked XGBoost model for NFL player projections, a video "
+    "tool that trims silences from raw footage, and a RAG chatbot for this portfolio. He enjoys "
+    "machine learning, AI ethics and football analytics."
+)
+
+@dataclass
+class ServiceProfile:
+    latency_ms: float = 0.0       # median time to the first byte
+    sigma: float = 0.35           # log-normal spread around the median
+    error_rate: float = 0.0
+    chunks: int = 12              # streamed pieces per LLM answer
+    chunk_delay_ms: float = 25.0  # time between streamed pieces
+
+@dataclass
+class StubConfig:
+    profiles: dict = field(default_factory=lambda: {name: ServiceProfile() for name in SERVICES})
+    seed: int = 0
+    dimension: int = 384
+
+class Stubs:
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.vectors: dict[str, tuple[list[float], dict]] = {}
+        self.readmes = self._load_readmes()
+        self.requests = {name: 0 for name in SERVICES}
+        self.errors = {name: 0 for name in SERVICES}
+
+    def _load_readmes(self) -> dict[str, str]:
+        readmes = {}
+        if os.path.isdir(FIXTURES):
+            for name in os.listdir(FIXTURES):
+                if name.endswith(".md"):
+                    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+                        readmes[name[:-3].lower()] = f.read()
+        return readmes
+
+    async def delay(self, service: str) -> Optional[JSONResponse]:
+        """Sleep for the service's latency; returns an error response if this call should fail"""
+        profile = self.config.profiles[service]
+        self.requests[service] += 1
+        if profile.latency_ms > 0:
+            median = profile.latency_ms / 1000
+            await asyncio.sleep(median * math.exp(self.random.gauss(0, profile.sigma)))
+        if profile.error_rate and self.random.random() < profile.error_rate:
+            self.errors[service] += 1
+            status = ERROR_STATUS[service]
+            return JSONResponse({"error": {"code": status, "message": f"{service} stub: injected error"}}, status_code=status)
+        return None
+
+    def pieces(self, service: str) -> list[str]:
+        words = ANSWER.split(" ")
+        count = max(1, min(self.config.profiles[service].chunks, len(words)))
+        size = math.ceil(len(words) / count)
+        return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "") for i in range(0, len(words), size)]
+
+    def readme(self, repo: str) -> str:
+        return self.readmes.get(repo.lower()) or f"# {repo}\n\n{repo} is one of Dixon's projects.\n\n## Features\n\n{ANSWER}\n"
+
+    def info(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors, "vectors": len(self.vectors)}
+
+def create_app(config: Optional[StubConfig] = None) -> FastAPI:
+    stubs = Stubs(config or StubConfig())
+    app = FastAPI()
+    app.state.stubs = stubs
+
+    @app.get("/stub/stats")
+    async def stats():
+        return stubs.info()
+
+    # --- GitHub GraphQL ---
+    repo_re = re.compile(r'(r\d+): repository\(owner: "[^"]*", name: "([^"]*)"\)\s*\{(.*?)\n\s*\}\s*$', re.S | re.M)
+    file_re = re.compile(r"(f\d+): object")
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        error = await stubs.delay("github")
+        if error:
+            return error
+        query = (await request.json())["query"]
+        data = {}
+        login = re.search(r'user\(login: "([^"]*)"\)', query)
+        if login:
+            data["user"] = {"bio": "Stub bio", "name": "Dixon Zor", "login": login.group(1)}
+        for alias, name, body in repo_re.findall(query):
+            readme = stubs.readme(name)
+            if "defaultBranchRef" in body:
+                oid = hashlib.sha1(readme.encode("utf-8")).hexdigest()
+                data[alias] = {"name": name, "description": f"{name} (stub)", "url": f"https://github.com/stub/{name}",
+                               "defaultBranchRef": {"target": {"oid": oid}}}
+            else:
+                files = file_re.findall(body)
+                data[alias] = {alias_f: ({"text": readme} if j == 0 else None) for j, alias_f in enumerate(files)}
+        return {"data": data}
+
+    # --- Gemini ---
+    def gemini_body(model: str, text: str, final: bool) -> dict:
+        body = {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}],
+            "modelVersion": model,
+        }
+        if final:
+            body["candidates"][0]["finishReason"] = "STOP"
+            body["usageMetadata"] = {"promptTokenCount": 400, "candidatesTokenCount": 60, "totalTokenCount": 460}
+        return body
+
+    @app.post("/v1beta/models/{target}")
+    async def gemini(target: str):
+        model, _, method = target.partition(":")
+        error = await stubs.delay("gemini")
+        if error:
+            return error
+        if method == "streamGenerateContent":
+            profile = stubs.config.profiles["gemini"]
+
+            async def events():
+                pieces = stubs.pieces("gemini")
+                for i, piece in enumerate(pieces):
+                    if i:
+                        await asyncio.sleep(profile.chunk_delay_ms / 1000)
+                    yield f"data: {json.dumps(gemini_body(model, piece, i == len(pieces) - 1))}\r\n\r\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return gemini_body(model, ANSWER, True)
+
+    # --- HuggingFace (OpenAI-compatible chat completions) ---
+    @app.post("/v1/chat/completions")
+    async def hf_chat(request: Request):
+        payload = await request.json()
+        error = await stubs.delay("hf")
+        if error:
+            return error
+        model = payload.get("model") or "stub"
+        created = int(time.time())
+        if payload.get("stream"):
+            profile = stubs.config.profiles["hf"]
+
+            async def events():
+                for i, piece in enumerate(stubs.pieces("hf")):
+                    if i:
+                        await asyncio.sleep(profile.chunk_delay_ms / 1000)
+                    chunk = {"id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return {
+            "id": "stub", "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 400, "completion_tokens": 60, "total_tokens": 460},
+        }
+
+    # --- Pinecone ---
+    @app.get("/indexes/{name}")
+    async def describe_index(name: str, request: Request):
+        host = f"http://{request.url.netloc}"
+        return {
+            "name": name, "dimension": stubs.config.dimension, "metric": "cosine", "host": host,
+            "spec": {"serverless": {"cloud": "aws", "region": "us-east-1"}},
+            "status": {"ready": True, "state": "Ready"},
+            "deletion_protection": "disabled", "vector_type": "dense",
+        }
+
+    @app.post("/vectors/upsert")
+    async def upsert(request: Request):
+        error = await stubs.delay("pinecone")
+        if error:
+            return error
+        vectors = (await request.json()).get("vectors", [])
+        for vector in vectors:
+            stubs.vectors[vector["id"]] = (vector["values"], vector.get("metadata") or {})
+        return {"upsertedCount": len(vectors)}
+
+    @app.post("/describe_index_stats")
+    async def describe_index_stats():
+        count = len(stubs.vectors)
+        return {"namespaces": {"": {"vectorCount": count}} if count else {}, "dimension": stubs.config.dimension,
+                "indexFullness": 0.0, "totalVectorCount": count}
+
+    @app.post("/vectors/delete")
+    async def delete(request: Request):
+        body = await request.json()
+        if body.get("deleteAll"):
+            stubs.vectors.clear()
+        for vector_id in body.get("ids") or []:
+            stubs.vectors.pop(vector_id, None)
+        return {}
+
+    @app.post("/query")
+    async def query(request: Request):
+        error = await stubs.delay("pinecone")
+        if error:
+            return error
+        body = await request.json()
+        vector = body.get("vector") or []
+        scored = sorted(
+            ((sum(a * b for a, b in zip(vector, values)), vector_id, metadata)
+             for vector_id, (values, metadata) in stubs.vectors.items()),
+            key=lambda item: -item[0],
+        )[:body.get("topK", 4)]
+        matches = [{"id": vector_id, "score": score, "values": [],
+                    **({"metadata": metadata} if body.get("includeMetadata") else {})}
+                   for score, vector_id, metadata in scored]
+        return {"matches": matches, "namespace": body.get("namespace", ""), "usage": {"readUnits": 1}}
+
+    return app
+
+def service_env(base_url: str) -> dict:
+    """Env that points main.py / main_hf.py at the stand-ins (fake keys, real client libraries)"""
+    return {
+        "GITHUB_GRAPHQL_URL": f"{base_url}/graphql",
+        "GITHUB_TOKEN": "bench",
+        "GEMINI_BASE_URL": base_url,
+        "GEMINI_API_KEY": "bench",
+        "HF_BASE_URL": base_url,
+        "HUGGINGFACEHUB_API_TOKEN": "bench",
+        "PINECONE_CONTROLLER_HOST": base_url,
+        "PINECONE_API_KEY": "bench",
+        "PINECONE_INDEX_NAME": "bench",
+    }
+
+def parse_map(value: str, cast=float) -> dict:
+    """"gemini=400,hf=900" -> {"gemini": 400.0, "hf": 900.0}"""
+    pairs = (item.split("=", 1) for item in value.split(",") if item)
+    return {key.strip(): cast(val) for key, val in pairs}
+
+def config_from_args(args) -> StubConfig:
+    config = StubConfig(seed=args.seed)
+    for attr, value in (("latency_ms", args.latency), ("error_rate", args.error_rate)):
+        for service, number in parse_map(value).items():
+            setattr(config.profiles[service], attr, number)
+    for profile in config.profiles.values():
+        profile.chunks = args.stream_chunks
+        profile.chunk_delay_ms = args.chunk_delay
+    return config
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", default="github=150,gemini=400,hf=900,pinecone=20",
+                        help="median latency per service in ms, e.g. gemini=400,hf=900")
+    parser.add_argument("--error-rate", default="", help="fraction of failing calls per service, e.g. gemini=0.05")
+    parser.add_argument("--stream-chunks", type=int, default=12)
+    parser.add_argument("--chunk-delay", type=float, default=25.0, help="ms between streamed chunks")
+    parser.add_argument("--seed", type=int, default=0)
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
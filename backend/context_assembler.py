@@ -0,0 +1,147 @@
+"""Relevance-selected, token-budgeted prompt context.
+
+Splits the resume and "about" text into small units (one bullet plus the entry it belongs
+to), scores them against the question with BM25, and packs the best ones into a token
+budget. Selected units are rendered back in resume order under their original headings,
+so the model sees a short resume rather than a bag of snippets.
+"""
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "did", "do", "does", "for", "from",
+    "has", "have", "he", "her", "his", "how", "i", "in", "is", "it", "its", "me", "of", "on",
+    "or", "she", "tell", "that", "the", "their", "them", "they", "this", "to", "was", "what",
+    "when", "where", "which", "who", "why", "with", "you", "your", "about", "dixon", "dixon's",
+}
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+TERM_RE = re.compile(r"[a-z0-9+#.]+")
+
+def count_tokens(text: str) -> int:
+    """Approximate BPE token count: one per punctuation mark, one per ~4 characters of each word"""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in WORD_RE.findall(text))
+
+def terms(text: str) -> list[str]:
+    out = []
+    for term in TERM_RE.findall(text.lower()):
+        term = term.strip(".")
+        if not term or term in STOPWORDS:
+            continue
+        if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        out.append(term)
+    return out
+
+@dataclass
+class Unit:
+    heading: str
+    entry: str
+    text: str
+    order: int
+    always: bool = False
+    terms: Counter = field(default_factory=Counter)
+    tokens: int = 0
+
+def split_sections(text: str, always_include: tuple[str, ...] = ()) -> list[Unit]:
+    """Split resume-style text (ALL-CAPS headings, blank-line separated entries, bullet lines) into units"""
+    units = []
+    heading = ""
+    for block in re.split(r"\n\s*\n", text.strip()):
+        lines = [line.rstrip() for line in block.strip().splitlines() if line.strip()]
+        if not lines:
+            continue
+        if lines[0].isupper() and len(lines[0]) < 40:
+            heading = lines.pop(0)
+            if not lines:
+                continue
+
+        bullets = [line for line in lines if line.lstrip().startswith("•")]
+        entry = "\n".join(line for line in lines if not line.lstrip().startswith("•"))
+        always = heading in always_include or not heading
+        for body in bullets or [""]:
+            units.append(Unit(heading=heading, entry=entry, text=body, order=len(units), always=always))
+
+    for unit in units:
+        unit.terms = Counter(terms(f"{unit.heading} {unit.entry} {unit.text}"))
+        unit.tokens = count_tokens(unit.text) + 1
+    return units
+
+class ContextAssembler:
+    def __init__(self, units: list[Unit], k1: float = 1.2, b: float = 0.75):
+        self.units = units
+        self.k1 = k1
+        self.b = b
+        self.avg_len = sum(sum(u.terms.values()) for u in units) / max(len(units), 1)
+        doc_freq = Counter(term for u in units for term in u.terms)
+        n = len(units)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+        self.entry_tokens = {(u.heading, u.entry): count_tokens(f"{u.heading}\n{u.entry}") + 2 for u in units}
+
+    def score(self, question: str) -> list[float]:
+        query = set(terms(question))
+        scores = []
+        for unit in self.units:
+            length = sum(unit.terms.values())
+            score = 0.0
+            for term in query:
+                tf = unit.terms.get(term, 0)
+                if tf:
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / self.avg_len)
+                    score += self.idf[term] * tf * (self.k1 + 1) / norm
+            scores.append(score)
+        return scores
+
+    def assemble(self, question: str, budget: int) -> str:
+        """Best-matching units that fit in `budget` tokens, rendered in original order"""
+        scores = self.score(question)
+        chosen: set[int] = set()
+        entries_used: set[tuple[str, str]] = set()
+        used = 0
+
+        def take(unit: Unit) -> bool:
+            nonlocal used
+            entry_key = (unit.heading, unit.entry)
+            cost = unit.tokens + (0 if entry_key in entries_used else self.entry_tokens[entry_key])
+            if used + cost > budget:
+                return False
+            chosen.add(unit.order)
+            entries_used.add(entry_key)
+            used += cost
+            return True
+
+        for unit in self.units:
+            if unit.always:
+                take(unit)
+
+        ranked = sorted((u for u in self.units if not u.always), key=lambda u: (-scores[u.order], u.order))
+        if not any(scores[u.order] > 0 for u in ranked):
+            # Nothing matched (e.g. "tell me about yourself") - fall back to resume order
+            matched = ranked
+        else:
+            matched = [u for u in ranked if scores[u.order] > 0]
+        for unit in matched:
+            take(unit)
+
+        return self.render(chosen)
+
+    def render(self, chosen: set[int]) -> str:
+        out = []
+        heading = entry = None
+        for unit in self.units:
+            if unit.order not in chosen:
+                continue
+            if unit.heading != heading:
+                heading = unit.heading
+                entry = None
+                if heading:
+                    out.append(f"\n{heading}")
+            if unit.entry != entry:
+                entry = unit.entry
+                if entry:
+                    out.append(entry)
+            if unit.text:
+                out.append(unit.text)
+        return "\n".join(out).strip()
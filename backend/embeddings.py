@@ -0,0 +1,126 @@
+"""Batched embedding layer with a persistent cache.
+
+Wraps any LangChain Embeddings model. Documents are looked up in an on-disk sqlite cache
+keyed by (model name, text hash), and only misses are sent to the model, in batches of
+EMBED_BATCH_SIZE. Query embeddings also go through an in-memory LRU so a repeated
+question never hits the model. Ingestion and retrieval both use this wrapper.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# sqlite file for cached document/query embeddings (empty = no disk cache)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/embed_cache.sqlite")
+EMBED_QUERY_CACHE_SIZE = int(os.getenv("EMBED_QUERY_CACHE_SIZE", "1024"))
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, model: Embeddings, model_name: str, batch_size: int = EMBED_BATCH_SIZE,
+                 cache_path: str = EMBED_CACHE_PATH, query_cache_size: int = EMBED_QUERY_CACHE_SIZE):
+        self.model = model
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.query_cache: OrderedDict[str, List[float]] = OrderedDict()
+        self.query_cache_size = query_cache_size
+        self.lock = threading.Lock()
+        self.stats = {"embedded": 0, "disk_hits": 0, "query_hits": 0, "batches": 0}
+
+        self.cache_path = cache_path
+        self._db = None
+        self._db_pid = None
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self.db.commit()
+
+    @property
+    def db(self) -> Optional[sqlite3.Connection]:
+        """This process's connection (a worker forked after the model was preloaded opens its own)"""
+        if not self.cache_path:
+            return None
+        if self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.cache_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db_pid = os.getpid()
+        return self._db
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load(self, keys: List[str]) -> dict:
+        if self.db is None or not keys:
+            return {}
+        found = {}
+        with self.lock:
+            # sqlite's default limit on bound parameters is 999
+            for start in range(0, len(keys), 900):
+                part = keys[start:start + 900]
+                rows = self.db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+        return found
+
+    def _store(self, items: List[tuple[str, List[float]]]):
+        if self.db is None or not items:
+            return
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+            )
+            self.db.commit()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        cached = self._load(list(set(keys)))
+        self.stats["disk_hits"] += sum(1 for key in keys if key in cached)
+
+        # Embed each distinct missing text once, in batches
+        missing = list(OrderedDict((key, text) for key, text in zip(keys, texts) if key not in cached).items())
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            vectors = self.model.embed_documents([text for _, text in batch])
+            self.stats["batches"] += 1
+            self.stats["embedded"] += len(batch)
+            fresh = [(key, vector) for (key, _), vector in zip(batch, vectors)]
+            cached.update(fresh)
+            self._store(fresh)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        # Kept apart from document keys: some models embed queries differently
+        key = self._key(f"query\0{text}")
+        with self.lock:
+            vector = self.query_cache.get(key)
+            if vector is not None:
+                self.query_cache.move_to_end(key)
+                self.stats["query_hits"] += 1
+                return vector
+
+        vector = self._load([key]).get(key)
+        if vector is None:
+            vector = self.model.embed_query(text)
+            self.stats["embedded"] += 1
+            self._store([(key, vector)])
+        else:
+            self.stats["disk_hits"] += 1
+
+        with self.lock:
+            self.query_cache[key] = vector
+            while len(self.query_cache) > self.query_cache_size:
+                self.query_cache.popitem(last=False)
+        return vector
+
+    def info(self) -> dict:
+        return {**self.stats, "model": self.model_name, "batch_size": self.batch_size,
+                "query_cache_entries": len(self.query_cache), "disk_cache": bool(self.cache_path)}
@@ -0,0 +1,220 @@
+"""On-disk snapshot of the GitHub data the backends use (profile, repo descriptions, READMEs).
+
+Each repo's README is stored with the commit OID of its default-branch head. A refresh
+first asks GitHub only for the current head OIDs and descriptions - one small query -
+and downloads READMEs just for repos whose head moved. Requests have timeouts and retry
+with exponential backoff on network errors, 5xx and rate limiting. Ingestion (main.py)
+and project contexts (main_hf.py) both read from this snapshot.
+"""
+import os
+import json
+import time
+import random
+import tempfile
+import threading
+from typing import Optional
+
+import requests
+
+from logs import get_logger
+
+log = get_logger("GitHub")
+
+# Overridable so benchmarks can point at a local stand-in server
+GITHUB_GRAPHQL_API = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+CONFIG_PATHS = [
+    "roster-portfolio/src/roster_config.json",
+    "../roster-portfolio/src/roster_config.json",
+    "src/roster_config.json"
+]
+# Shared snapshot file, so data is available at startup without calling GitHub
+GITHUB_SNAPSHOT_PATH = os.getenv("GITHUB_SNAPSHOT_PATH", "data/github_snapshot.json")
+# (connect, read) timeouts in seconds for GitHub requests
+GITHUB_TIMEOUT = (float(os.getenv("GITHUB_CONNECT_TIMEOUT", "5")), float(os.getenv("GITHUB_READ_TIMEOUT", "20")))
+# Attempts per request; waits double from GITHUB_BACKOFF seconds between them
+GITHUB_RETRIES = int(os.getenv("GITHUB_RETRIES", "3"))
+GITHUB_BACKOFF = float(os.getenv("GITHUB_BACKOFF", "1.0"))
+# Never sleep longer than this for a single retry, even if GitHub asks us to
+GITHUB_MAX_BACKOFF = 60.0
+
+# Repos without a README.md fall back to these (first match wins)
+README_PATHS = ["README.md", "readme.md", "Readme.md", "README.rst", "README"]
+
+def load_roster() -> tuple[Optional[str], list[dict]]:
+    for path in CONFIG_PATHS:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+                return config.get("github_username"), config.get("roster", [])
+        except FileNotFoundError:
+            continue
+    log.warning("could not find roster_config.json", paths=CONFIG_PATHS)
+    return None, []
+
+class GitHubError(Exception):
+    pass
+
+def graphql(query: str, token: Optional[str] = GITHUB_TOKEN, retries: int = GITHUB_RETRIES,
+            backoff: float = GITHUB_BACKOFF, timeout=GITHUB_TIMEOUT) -> dict:
+    """POST a GraphQL query, retrying transient failures. Returns the `data` object."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    for attempt in range(max(retries, 1)):
+        wait = backoff * (2 ** attempt) * (0.5 + random.random())
+        try:
+            resp = requests.post(GITHUB_GRAPHQL_API, json={"query": query}, headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            error = f"GitHub request failed: {e}"
+        else:
+            if resp.status_code == 200:
+                body = resp.json()
+                # Partial errors (e.g. one repo renamed) still come with usable data
+                if body.get("data") is None:
+                    raise GitHubError(f"GitHub API Failed: {body.get('errors')}")
+                return body["data"]
+            error = f"GitHub API Failed ({resp.status_code}): {resp.text[:200]}"
+            if resp.status_code in (403, 429) and (
+                resp.headers.get("retry-after") or resp.headers.get("x-ratelimit-remaining") == "0"
+            ):
+                if resp.headers.get("retry-after"):
+                    wait = float(resp.headers["retry-after"])
+                elif resp.headers.get("x-ratelimit-reset"):
+                    wait = float(resp.headers["x-ratelimit-reset"]) - time.time()
+            elif resp.status_code < 500:
+                raise GitHubError(error)
+
+        if attempt + 1 < retries:
+            wait = min(max(wait, 0), GITHUB_MAX_BACKOFF)
+            log.warning("request failed, retrying", error=error, wait_s=round(wait, 1), attempt=attempt + 1)
+            time.sleep(wait)
+    raise GitHubError(error)
+
+class GitHubSnapshot:
+    def __init__(self, path: str = GITHUB_SNAPSHOT_PATH, token: Optional[str] = GITHUB_TOKEN):
+        self.path = path
+        self.token = token
+        self.username, self.roster = load_roster()
+        self.repo_names = [p["repo_name"] for p in self.roster if p.get("repo_name")]
+        self.user: dict = {}
+        self.repos: dict[str, dict] = {}
+        self.stats = {"refreshes": 0, "readmes_fetched": 0, "last_refresh": None, "last_changed": []}
+        self.lock = threading.Lock()
+        self.mtime: Optional[int] = None
+        self._load()
+
+    def repo(self, repo_name: str) -> Optional[dict]:
+        return self.repos.get(repo_name.lower())
+
+    def refresh(self, force: bool = False) -> list[str]:
+        """Sync with GitHub. Returns the names of repos whose README was re-downloaded.
+
+        One query fetches the profile, descriptions and head OIDs; a second query (only
+        when something moved, or with force=True) fetches READMEs for the changed repos.
+        """
+        if not self.token or not self.username or not self.repo_names:
+            return []
+
+        with self.lock:
+            heads = graphql(self._heads_query(), self.token)
+            self.user = heads.get("user") or self.user
+
+            changed = []
+            for index, name in enumerate(self.repo_names):
+                repo = heads.get(f"r{index}")
+                if not repo:
+                    continue
+                key = name.lower()
+                oid = ((repo.get("defaultBranchRef") or {}).get("target") or {}).get("oid")
+                entry = self.repos.setdefault(key, {"readme": "", "oid": None})
+                entry.update(name=repo["name"], description=repo.get("description") or "", url=repo.get("url"))
+                if force or oid is None or entry.get("oid") != oid:
+                    changed.append((index, key, oid))
+
+            if changed:
+                readmes = graphql(self._readmes_query([(i, self.repos[k]["name"]) for i, k, _ in changed]), self.token)
+                for index, key, oid in changed:
+                    repo = readmes.get(f"r{index}") or {}
+                    texts = [(repo.get(f"f{j}") or {}).get("text") for j in range(len(README_PATHS))]
+                    self.repos[key].update(readme=next((t for t in texts if t), ""), oid=oid)
+                self.stats["readmes_fetched"] += len(changed)
+
+            self.stats["refreshes"] += 1
+            self.stats["last_refresh"] = time.time()
+            self.stats["last_changed"] = [self.repos[key]["name"] for _, key, _ in changed]
+            self._save()
+            return self.stats["last_changed"]
+
+    def reload_if_changed(self) -> bool:
+        """Pick up a snapshot saved by another process (the worker that refreshes it)"""
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self._load()
+        return True
+
+    def info(self) -> dict:
+        return {
+            **self.stats,
+            "repos": {key: {"oid": repo.get("oid"), "readme_chars": len(repo.get("readme", ""))}
+                      for key, repo in self.repos.items()},
+        }
+
+    def _heads_query(self) -> str:
+        repo_queries = ""
+        for index, name in enumerate(self.repo_names):
+            repo_queries += f"""
+            r{index}: repository(owner: "{self.username}", name: "{name}") {{
+                name
+                description
+                url
+                defaultBranchRef {{ target {{ oid }} }}
+            }}
+            """
+        return f"""
+        query {{
+            user(login: "{self.username}") {{ bio name login }}
+            {repo_queries}
+        }}
+        """
+
+    def _readmes_query(self, repos: list[tuple[int, str]]) -> str:
+        repo_queries = ""
+        for index, name in repos:
+            files = "\n".join(
+                f'f{j}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+                for j, path in enumerate(README_PATHS)
+            )
+            repo_queries += f"""
+            r{index}: repository(owner: "{self.username}", name: "{name}") {{
+                {files}
+            }}
+            """
+        return f"query {{ {repo_queries} }}"
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        self.mtime = self._file_mtime()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.user = snapshot.get("user") or {}
+        self.repos = snapshot.get("repos") or {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A temp file of its own, so two processes saving at once can't interleave their writes
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory or ".", suffix=".tmp",
+                                         prefix=os.path.basename(self.path) + ".", delete=False) as f:
+            json.dump({"user": self.user, "repos": self.repos}, f)
+        os.replace(f.name, self.path)
+        self.mtime = self._file_mtime()
@@ -0,0 +1,76 @@
+"""Pre-fork production server: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py                       # main_hf:app
+    APP_MODULE=main:app gunicorn -c gunicorn.conf.py   # the RAG backend
+
+The app is imported once in the master (preload_app), then the app module's optional
+`preload()` loads read-only models and indexes before any worker is forked, so every
+worker shares those pages copy-on-write instead of loading its own copy. gc.freeze()
+keeps the collector from touching (and so copying) them afterwards.
+
+Workers default to one per available CPU. State the workers need to agree on lives in a
+shared run directory: the answer cache's sqlite tier, chat sessions, metric snapshots
+(merged on /metrics), ingest job state and the lock that lets one worker refresh project
+READMEs for all. Admission limits and per-IP rate limits still apply per worker.
+SIGTERM drains: workers stop accepting, finish in-flight requests for up to
+GRACEFUL_TIMEOUT seconds, then run the app's shutdown.
+"""
+import gc
+import os
+import sys
+import glob
+import shutil
+import tempfile
+
+CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+# The ASGI app to serve
+APP_MODULE = os.getenv("APP_MODULE", "main_hf:app")
+# Worker processes (default: one per CPU this container may use)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0")) or CPUS
+# Seconds a worker gets to finish in-flight requests on shutdown or restart
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# Directory for state shared by the workers (default: a fresh temp dir per server run)
+SHARED_STATE_DIR = os.getenv("SHARED_STATE_DIR", "")
+
+_own_state_dir = not SHARED_STATE_DIR
+state_dir = SHARED_STATE_DIR or tempfile.mkdtemp(prefix="portfolio-")
+# Read by the app modules at import, which with preload_app happens after this file runs
+os.environ.setdefault("ANSWER_CACHE_DB", os.path.join(state_dir, "answer_cache.sqlite"))
+os.environ.setdefault("SESSION_DB", os.path.join(state_dir, "sessions.sqlite"))
+os.environ.setdefault("METRICS_DIR", os.path.join(state_dir, "metrics"))
+os.environ.setdefault("INGEST_JOBS_DIR", os.path.join(state_dir, "ingest_jobs"))
+os.environ.setdefault("PROJECT_REFRESH_LOCK", os.path.join(state_dir, "project_refresh.lock"))
+
+wsgi_app = APP_MODULE
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+graceful_timeout = GRACEFUL_TIMEOUT
+# Streamed answers can take a while; this only bounds a worker that stops responding
+timeout = 120
+keepalive = 5
+accesslog = None
+
+def on_starting(server):
+    # Snapshots from a previous run would be added to this run's totals
+    for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "metrics-*.json")):
+        os.remove(path)
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before the first fork"""
+    module = sys.modules.get(APP_MODULE.split(":", 1)[0])
+    if hasattr(module, "preload"):
+        server.log.info("preloading shared models and indexes")
+        module.preload()
+    gc.freeze()
+
+def post_fork(server, worker):
+    # One torch thread pool per worker would oversubscribe the CPUs
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(max(1, CPUS // WEB_CONCURRENCY))
+
+def on_exit(server):
+    if _own_state_dir:
+        shutil.rmtree(state_dir, ignore_errors=True)
@@ -0,0 +1,188 @@
+"""Hybrid lexical + vector retrieval for the RAG chat in main.py.
+
+A BM25 inverted index is built over the same chunks as the vector index at ingestion
+time and saved next to the ingest manifest. At query time BM25 runs first (microseconds,
+no model); when its top hit is clearly ahead - typically a question naming a project or
+technology - that ranking is used directly and the embedding call is skipped. Otherwise
+the question is embedded, the vector store searched, and both rankings are merged with
+reciprocal rank fusion.
+"""
+import os
+import json
+import math
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from context_assembler import terms
+from ingestion import chunk_id
+from metrics import STAGE_SECONDS
+
+# BM25 index built by /api/ingest
+LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "data/lexical_index.json")
+# Lexical fast path: the top BM25 hit must score HYBRID_FASTPATH_MARGIN times the runner-up
+# and contain a query term found in at most HYBRID_FASTPATH_MAX_DF chunks.
+# Set HYBRID_FASTPATH=false to always run the vector search.
+HYBRID_FASTPATH = os.getenv("HYBRID_FASTPATH", "true").lower() == "true"
+HYBRID_FASTPATH_MARGIN = float(os.getenv("HYBRID_FASTPATH_MARGIN", "1.6"))
+HYBRID_FASTPATH_MAX_DF = int(os.getenv("HYBRID_FASTPATH_MAX_DF", "2"))
+# Candidates taken from each ranking before fusion
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+# Standard RRF constant; larger values flatten the difference between ranks
+RRF_K = 60
+
+class LexicalIndex:
+    def __init__(self, path: str = LEXICAL_INDEX_PATH, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        # (ids, texts, metadatas, lengths, avg_len, postings, idf) - replaced as a whole on rebuild
+        self._index = ([], [], [], [], 0.0, {}, {})
+        # mtime of the file the index was loaded from or saved to
+        self.mtime = None
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._index[0])
+
+    def build(self, chunks: list[tuple[str, str, dict]]):
+        """Index (id, text, metadata) chunks, replacing the previous index"""
+        ids, texts, metadatas, lengths = [], [], [], []
+        postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for doc, (cid, text, metadata) in enumerate(chunks):
+            counts = Counter(terms(text))
+            for term, tf in counts.items():
+                postings[term].append((doc, tf))
+            ids.append(cid)
+            texts.append(text)
+            metadatas.append(metadata)
+            lengths.append(sum(counts.values()))
+        self._swap(ids, texts, metadatas, lengths, dict(postings))
+
+    def _swap(self, ids, texts, metadatas, lengths, postings):
+        n = len(ids)
+        avg_len = sum(lengths) / max(n, 1)
+        idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for term, p in postings.items()}
+        self._index = (ids, texts, metadatas, lengths, avg_len, postings, idf)
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Top-k (doc index, BM25 score); only documents sharing a term with the query are touched"""
+        _, _, _, lengths, avg_len, postings, idf = self._index
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(terms(query)):
+            for doc, tf in postings.get(term, ()):
+                norm = tf + self.k1 * (1 - self.b + self.b * lengths[doc] / avg_len)
+                scores[doc] += idf[term] * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def postings(self, term: str) -> list[tuple[int, int]]:
+        return self._index[5].get(term, [])
+
+    def document(self, doc: int) -> tuple[str, Document]:
+        ids, texts, metadatas, *_ = self._index
+        return ids[doc], Document(page_content=texts[doc], metadata={**metadatas[doc], "id": ids[doc]})
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        mtime = self._file_mtime()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        postings = {term: [tuple(p) for p in plist] for term, plist in data["postings"].items()}
+        self._swap(data["ids"], data["texts"], data["metadatas"], data["lengths"], postings)
+        self.mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        """Pick up an index saved by another process (e.g. an ingest run by another worker)"""
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        ids, texts, metadatas, lengths, _, postings, _ = self._index
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "texts": texts, "metadatas": metadatas, "lengths": lengths, "postings": postings}, f)
+        os.replace(tmp_path, self.path)
+        self.mtime = self._file_mtime()
+
+def rrf(rankings: list[list[str]], k: int = RRF_K) -> list[str]:
+    """Reciprocal rank fusion: each ranking contributes 1 / (k + rank) per id"""
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] += 1 / (k + rank)
+    return sorted(scores, key=lambda key: -scores[key])
+
+def doc_key(doc: Document) -> str:
+    """Chunk ID of a vector search hit (Pinecone sets doc.id; otherwise rebuild it from the content)"""
+    if getattr(doc, "id", None):
+        return doc.id
+    if doc.metadata.get("id"):
+        return doc.metadata["id"]
+    metadata = {key: value for key, value in doc.metadata.items() if key != "id"}
+    return chunk_id(doc.page_content, metadata)
+
+def lexically_confident(lexical: LexicalIndex, question: str, hits: list[tuple[int, float]],
+                        margin: float = HYBRID_FASTPATH_MARGIN, max_df: int = HYBRID_FASTPATH_MAX_DF) -> bool:
+    """True when the top BM25 hit is clearly ahead of the runner-up and matches a rare query
+    term (a project or technology name that only a few chunks mention)"""
+    if not hits or (len(hits) > 1 and hits[0][1] < margin * hits[1][1]):
+        return False
+    top = hits[0][0]
+    return any(len(plist) <= max_df and any(doc == top for doc, _ in plist)
+               for plist in (lexical.postings(term) for term in set(terms(question))))
+
+def hybrid_search(question: str, lexical: LexicalIndex, store, embeddings, k: int = 3,
+                  candidates: int = HYBRID_CANDIDATES, fastpath: bool = HYBRID_FASTPATH) -> tuple[list[Document], dict]:
+    """Top-k documents plus {"path": "lexical" | "hybrid" | "vector", "timings_ms": {...}}"""
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+
+    def lap(stage: str):
+        nonlocal start
+        now = time.perf_counter()
+        timings[stage] = round((now - start) * 1000, 2)
+        STAGE_SECONDS.observe(now - start, stage=stage)
+        start = now
+
+    hits = lexical.search(question, candidates) if len(lexical) else []
+    lap("lexical")
+    if fastpath and lexically_confident(lexical, question, hits):
+        return [lexical.document(doc)[1] for doc, _ in hits[:k]], {"path": "lexical", "timings_ms": timings}
+
+    vector = embeddings.embed_query(question)
+    lap("embed")
+    dense = store.similarity_search_by_vector(vector, k=candidates if hits else k)
+    lap("vector")
+    if not hits:
+        return dense[:k], {"path": "vector", "timings_ms": timings}
+
+    by_key: dict[str, Document] = {}
+    lexical_ranking = []
+    for doc, _ in hits:
+        key, document = lexical.document(doc)
+        by_key[key] = document
+        lexical_ranking.append(key)
+    dense_ranking = []
+    for document in dense:
+        key = doc_key(document)
+        by_key.setdefault(key, document)
+        dense_ranking.append(key)
+    fused = [by_key[key] for key in rrf([dense_ranking, lexical_ranking])[:k]]
+    lap("fuse")
+    return fused, {"path": "hybrid", "timings_ms": timings}
@@ -0,0 +1,231 @@
+"""Background job runner for RAG ingestion.
+
+An ingest (GitHub fetch, splitting, embedding, upserts) runs as a job on its own small
+thread pool, off the event loop and away from the default executor the chat endpoints
+use. Only one job runs at a time; each records its phase, chunk counts and per-phase
+timings so progress can be polled while it runs.
+
+With several worker processes, set INGEST_JOBS_DIR: job state is written there so any
+worker can answer a status poll, and a file lock keeps it to one ingest across workers.
+"""
+import os
+import re
+import glob
+import json
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from logs import get_logger
+
+log = get_logger("Ingest")
+
+# Threads reserved for ingestion (embedding models release the GIL, so 1-2 is plenty)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+# Finished jobs kept for GET /api/ingest/{job_id}
+INGEST_JOB_HISTORY = int(os.getenv("INGEST_JOB_HISTORY", "20"))
+# Directory shared by the worker processes for job state (empty = this process only)
+INGEST_JOBS_DIR = os.getenv("INGEST_JOBS_DIR", "")
+if INGEST_JOBS_DIR:
+    import fcntl  # POSIX only, like the pre-fork server that needs it
+
+JOB_ID = re.compile(r"^[0-9a-f]{12}$")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+class IngestJob:
+    def __init__(self, full: bool):
+        self.id = uuid.uuid4().hex[:12]
+        self.full = full
+        self.status = QUEUED
+        self.phase = None
+        self.counts: dict = {}
+        self.timings: dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._phase_start = None
+        self.future = None
+        # Where the job's state is written for other workers (None = not shared)
+        self.path: Optional[str] = None
+
+    @classmethod
+    def from_info(cls, info: dict) -> "IngestJob":
+        """A read-only copy of a job written by another worker"""
+        job = cls(info["full"])
+        job.id = info["job_id"]
+        job.status = info["status"]
+        job.phase = info["phase"]
+        job.counts = info["counts"]
+        job.timings = info["timings_ms"]
+        job.error = info["error"]
+        job.created_at = info["created_at"]
+        job.finished_at = info["finished_at"]
+        return job
+
+    def save(self):
+        if self.path is None:
+            return
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.info(), f)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def enter(self, phase: str, **counts):
+        """Move to the next phase, closing the timer of the previous one"""
+        self._close_phase()
+        self.phase = phase
+        self._phase_start = time.perf_counter()
+        self.counts.update(counts)
+        self.save()
+        log.info("phase", job=self.id, phase=phase)
+
+    def _close_phase(self):
+        if self.phase is not None and self._phase_start is not None:
+            self.timings[self.phase] = round((time.perf_counter() - self._phase_start) * 1000, 1)
+            self._phase_start = None
+
+    def finish(self, error: Optional[str] = None):
+        self._close_phase()
+        self.status = FAILED if error else SUCCEEDED
+        # A failed job keeps the phase it failed in
+        if not error:
+            self.phase = "done"
+        self.error = error
+        self.finished_at = time.time()
+        self.save()
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "phase": self.phase,
+            "full": self.full,
+            "counts": self.counts,
+            "timings_ms": self.timings,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+class IngestJobs:
+    def __init__(self, workers: int = INGEST_WORKERS, history: int = INGEST_JOB_HISTORY,
+                 directory: str = INGEST_JOBS_DIR):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self.jobs: OrderedDict[str, IngestJob] = OrderedDict()
+        self.history = history
+        self.lock = threading.Lock()
+        self.active: Optional[IngestJob] = None
+        self.directory = directory
+        self._lock_file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def start(self, run: Callable[[IngestJob], dict], full: bool = False) -> tuple[IngestJob, bool]:
+        """Start `run(job)` in the background. Returns (job, started); if an ingest is
+        already running (here or in another worker), that job is returned with started=False."""
+        with self.lock, self._starting():
+            if self.active is not None:
+                return self.active, False
+            if self.directory and not self._acquire():
+                # The lock holder wrote its job before letting go of the start lock
+                return self._latest_stored(running_only=True) or self._latest_stored(), False
+            job = IngestJob(full)
+            self.active = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.history:
+                self.jobs.popitem(last=False)
+            if self.directory:
+                job.path = os.path.join(self.directory, f"{job.id}.json")
+                job.save()
+                self._prune()
+
+        job.future = asyncio.get_running_loop().run_in_executor(self.executor, self._run, job, run)
+        return job, True
+
+    def _run(self, job: IngestJob, run: Callable[[IngestJob], dict]):
+        job.status = RUNNING
+        job.save()
+        try:
+            job.counts.update(run(job) or {})
+            job.finish()
+        except Exception as e:
+            log.error("job failed", job=job.id, error=str(e))
+            job.finish(str(e))
+        finally:
+            with self.lock:
+                self.active = None
+                self._release()
+
+    @contextmanager
+    def _starting(self):
+        """Serializes start() across workers (held only while a job's record is written)"""
+        if not self.directory:
+            yield
+            return
+        with open(os.path.join(self.directory, "start.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _acquire(self) -> bool:
+        """Take the cross-worker ingest lock (released by the OS if this worker dies)"""
+        lock_file = open(os.path.join(self.directory, "ingest.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _stored(self) -> list[IngestJob]:
+        jobs = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    jobs.append(IngestJob.from_info(json.load(f)))
+            except (OSError, json.JSONDecodeError, KeyError):
+                continue
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def _latest_stored(self, running_only: bool = False) -> Optional[IngestJob]:
+        jobs = [job for job in self._stored() if not running_only or job.status in (QUEUED, RUNNING)]
+        return jobs[-1] if jobs else None
+
+    def _prune(self):
+        for job in self._stored()[:-self.history]:
+            try:
+                os.remove(os.path.join(self.directory, f"{job.id}.json"))
+            except FileNotFoundError:
+                pass
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        job = self.jobs.get(job_id)
+        if job is None and self.directory and JOB_ID.match(job_id):
+            try:
+                with open(os.path.join(self.directory, f"{job_id}.json"), "r", encoding="utf-8") as f:
+                    job = IngestJob.from_info(json.load(f))
+            except (OSError, json.JSONDecodeError):
+                return None
+        return job
+
+    def latest(self) -> Optional[IngestJob]:
+        if self.directory:
+            return self._latest_stored()
+        return next(reversed(self.jobs.values()), None)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,145 @@
+"""Incremental ingestion for the RAG index in main.py.
+
+Every chunk gets a deterministic ID from a hash of its source and content. A local
+manifest records which IDs are already in the index, so a re-ingest only embeds and
+upserts new or changed chunks and deletes vectors whose chunk no longer exists. A run
+where nothing changed does no embedding work at all.
+
+There is one manifest per vector backend and index name, and an empty index is always
+re-synced in full, so switching backends or wiping an index never leaves it empty
+behind a manifest that claims otherwise.
+"""
+import os
+import re
+import json
+import hashlib
+from typing import Callable, Optional
+
+from markdown_chunker import chunk_markdown
+from logs import get_logger
+
+log = get_logger("Ingestion")
+
+# Record of what is currently in the vector index (suffixed per backend and index, see manifest_path_for)
+INGEST_MANIFEST_PATH = os.getenv("INGEST_MANIFEST_PATH", "data/ingest_manifest.json")
+
+def manifest_path_for(backend: str, index_name: Optional[str], base: str = INGEST_MANIFEST_PATH) -> str:
+    """data/ingest_manifest.json -> data/ingest_manifest.pinecone.my-index.json"""
+    root, ext = os.path.splitext(base)
+    index = re.sub(r"[^\w.-]", "_", index_name or "default")
+    return f"{root}.{backend}.{index}{ext or '.json'}"
+
+def index_size(store) -> Optional[int]:
+    """Vectors in the store, or None if it can't tell"""
+    if hasattr(store, "count"):
+        return store.count()
+    index = getattr(store, "index", None)  # PineconeVectorStore
+    if index is None:
+        return None
+    try:
+        return index.describe_index_stats().total_vector_count
+    except Exception as e:
+        log.warning("could not read index stats", error=str(e))
+        return None
+
+def chunk_id(text: str, metadata: dict) -> str:
+    return hashlib.sha256(f"{metadata.get('source', '')}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+def build_chunks(data: dict, roster: list[dict], splitter=None) -> list[tuple[str, str, dict]]:
+    """Turn GitHub data into (id, text, metadata) chunks, deduplicated by ID.
+
+    READMEs go through the markdown-aware chunker (sections, heading paths, noise and
+    near-duplicates removed). Passing a LangChain `splitter` restores the old plain
+    character splitting of the whole text, which bench/eval_chunking.py compares against.
+    """
+    chunks = {}
+
+    def add(text: str, metadata: dict):
+        cid = chunk_id(text, metadata)
+        chunks.setdefault(cid, (cid, text, metadata))
+
+    # 1. Process QB (Bio)
+    qb = data['user']
+    add(f"Candidate: {qb['name']}. Bio: {qb['bio']}", {"source": "profile", "type": "bio"})
+
+    # 2. Process Roster (Projects)
+    for player in roster:
+        repo_data = data.get(player['position'])
+        if not repo_data: continue
+
+        readme = (repo_data.get('object') or {}).get('text', "")
+        metadata = {"source": player['repo_name'], "type": "project"}
+
+        if splitter is not None:
+            full_text = f"Project: {player['display_name']}\nDesc: {repo_data['description']}\nReadme: {readme}"
+            for chunk in splitter.split_text(full_text):
+                add(chunk, metadata)
+            continue
+
+        if repo_data.get('description'):
+            add(f"Project: {player['display_name']}\nDesc: {repo_data['description']}", metadata)
+        for chunk, section in chunk_markdown(readme, title=f"Project: {player['display_name']}"):
+            add(chunk, {**metadata, "section": section})
+
+    return list(chunks.values())
+
+def load_manifest(path: str = INGEST_MANIFEST_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest: dict, path: str = INGEST_MANIFEST_PATH):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+
+def sync_index(store, chunks: list[tuple[str, str, dict]], manifest_path: str = INGEST_MANIFEST_PATH,
+               full: bool = False, progress: Optional[Callable[..., None]] = None) -> dict:
+    """Bring the vector store in line with `chunks`. Returns counts of what was done.
+
+    `store` needs add_texts(texts, metadatas, ids) and delete(ids) (the LangChain
+    VectorStore interface). With full=True the index is wiped and rebuilt, which also
+    clears duplicates left behind by ingests that ran before IDs were assigned.
+    `progress(phase, **counts)` is called as the sync moves between phases.
+    """
+    progress = progress or (lambda phase, **counts: None)
+    manifest = {} if full else load_manifest(manifest_path)
+    if manifest and index_size(store) == 0:
+        # Wiped or recreated since the manifest was written: nothing in it is really there
+        log.warning("index is empty, re-syncing every chunk", manifest=manifest_path)
+        manifest = {}
+    current = {cid: (text, metadata) for cid, text, metadata in chunks}
+
+    to_add = [cid for cid in current if cid not in manifest]
+    to_delete = [cid for cid in manifest if cid not in current]
+
+    progress("deleting", to_delete=len(to_delete), to_add=len(to_add))
+    if full:
+        store.delete(delete_all=True)
+    elif to_delete:
+        store.delete(ids=to_delete)
+
+    progress("embedding", to_add=len(to_add))
+    if to_add:
+        store.add_texts(
+            texts=[current[cid][0] for cid in to_add],
+            metadatas=[current[cid][1] for cid in to_add],
+            ids=to_add,
+        )
+
+    if to_add or to_delete or full or not os.path.exists(manifest_path):
+        save_manifest({cid: {"source": metadata.get("source")} for cid, (_, metadata) in current.items()}, manifest_path)
+
+    return {
+        "added": len(to_add),
+        "deleted": len(to_delete),
+        "unchanged": len(current) - len(to_add),
+        "total": len(current),
+        "full_rebuild": full,
+    }
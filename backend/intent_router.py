@@ -0,0 +1,118 @@
+"""Zero-LLM intent routing for greetings, FAQs and canned topic answers.
+
+Keyword and phrase tables are loaded from intents.json and compiled into one
+word-boundary regex shaped like a trie, so a message is scanned once no matter how
+many terms there are. A trailing "*" on a keyword matches any word starting with it
+("skill*" -> skills). Each match covers some words of the message; the intent covering
+the most words wins, and its confidence is the share of the message's non-filler words
+it covers - "hi!" is a greeting with confidence 1.0, "hi, what's his GPA?" only 0.5.
+"""
+import os
+import re
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+# Intent tables (keywords, phrases, responses)
+INTENTS_PATH = os.getenv("INTENTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json"))
+# Minimum confidence for main_hf to answer from the table instead of calling a model
+INTENT_FASTPATH_CONFIDENCE = float(os.getenv("INTENT_FASTPATH_CONFIDENCE", "0.75"))
+
+@dataclass
+class IntentMatch:
+    name: str
+    response: str
+    confidence: float
+    fast_path: bool
+
+def normalize(text: str) -> str:
+    text = text.lower().replace("’", "'")
+    return re.sub(r"[^\w']+", " ", text).strip()
+
+def _trie_pattern(node: dict) -> str:
+    alternatives = []
+    for char in sorted(key for key in node if key):
+        child = _trie_pattern(node[char])
+        alternatives.append((r"\w*" if char == "*" else re.escape(char)) + child)
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    # "" marks the end of a term; anything below it is optional (longer terms are tried first)
+    return f"(?:{body})?" if "" in node else body
+
+def compile_terms(terms: list[str]) -> re.Pattern:
+    """One regex matching any of `terms` as whole words"""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return re.compile(rf"(?<![\w']){_trie_pattern(trie)}(?![\w'])")
+
+class IntentRouter:
+    def __init__(self, intents: list[dict], filler: list[str] = (), fallback: Optional[str] = None):
+        self.intents = intents
+        self.filler = {normalize(word) for word in filler}
+        self.fallback = fallback
+        self.exact: dict[str, set[int]] = {}
+        self.prefixes: list[tuple[str, set[int]]] = []
+
+        for index, intent in enumerate(intents):
+            for term in intent.get("keywords", []) + intent.get("phrases", []):
+                wildcard = term.endswith("*")
+                term = normalize(term.rstrip("*"))
+                if not term:
+                    continue
+                if wildcard:
+                    self.prefixes.append((term, {index}))
+                else:
+                    self.exact.setdefault(term, set()).add(index)
+        self.prefixes.sort(key=lambda item: -len(item[0]))
+        self.pattern = compile_terms(list(self.exact) + [f"{prefix}*" for prefix, _ in self.prefixes])
+
+    @classmethod
+    def from_file(cls, path: str = INTENTS_PATH) -> "IntentRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["intents"], data.get("filler", []), data.get("fallback"))
+
+    def _intents_for(self, term: str) -> set[int]:
+        if term in self.exact:
+            return self.exact[term]
+        return next((intents for prefix, intents in self.prefixes if term.startswith(prefix)), set())
+
+    def route(self, message: str) -> Optional[IntentMatch]:
+        """Best intent for `message`, or None if no term matches"""
+        text = normalize(message)
+        if not text:
+            return None
+        words = text.split(" ")
+
+        covered: dict[int, set[int]] = {}
+        for match in self.pattern.finditer(text):
+            first = text.count(" ", 0, match.start())
+            positions = range(first, first + match.group().count(" ") + 1)
+            for index in self._intents_for(match.group()):
+                covered.setdefault(index, set()).update(positions)
+        if not covered:
+            return None
+
+        # Most words covered wins; ties go to the intent listed first
+        best = max(covered, key=lambda index: (len(covered[index]), -index))
+        matched = set().union(*covered.values())
+        content = {i for i, word in enumerate(words) if word not in self.filler} | matched
+        intent = self.intents[best]
+        return IntentMatch(
+            name=intent["name"],
+            response=intent["response"],
+            confidence=round(len(covered[best]) / len(content), 3),
+            fast_path=bool(intent.get("fast_path")),
+        )
+
+    def fast_answer(self, message: str, min_confidence: float = INTENT_FASTPATH_CONFIDENCE) -> Optional[IntentMatch]:
+        """A canned answer safe to send without an LLM: a fast-path intent that covers (nearly) the whole message"""
+        match = self.route(message)
+        if match and match.fast_path and match.confidence >= min_confidence:
+            return match
+        return None
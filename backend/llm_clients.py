@@ -0,0 +1,87 @@
+"""Process-wide async LLM clients for main_hf.
+
+The clients are created once (in the app lifespan, or lazily on first use) and shared by
+every request so HTTP connections stay pooled and alive between chats. All calls made
+through them are non-blocking, so a slow model never stalls the event loop.
+"""
+import os
+
+from logs import get_logger
+
+log = get_logger("LLM Clients")
+
+# Max pooled connections to the Gemini API (kept alive between requests). The HF client keeps
+# its own persistent pool; concurrent HF calls are capped by admission control instead.
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+# Per-request timeout for a single model call, in seconds
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+# Seconds an idle pooled connection is kept open
+LLM_KEEPALIVE = float(os.getenv("LLM_KEEPALIVE", "60"))
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+HF_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN")
+# Alternative API endpoints (e.g. the stand-in servers in bench/stubs.py); unset = the real APIs
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+HF_BASE_URL = os.getenv("HF_BASE_URL")
+
+_gemini = None
+_gemini_http = None
+_hf = None
+
+def gemini():
+    """Shared google-genai client - use its .aio interface for non-blocking calls"""
+    global _gemini, _gemini_http
+    if _gemini is None and GEMINI_API_KEY:
+        import httpx
+        from google import genai
+        from google.genai import types
+
+        _gemini_http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_SIZE,
+                max_keepalive_connections=LLM_POOL_SIZE,
+                keepalive_expiry=LLM_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT),
+        )
+        _gemini = genai.Client(
+            api_key=GEMINI_API_KEY,
+            http_options=types.HttpOptions(
+                base_url=GEMINI_BASE_URL,
+                timeout=int(LLM_TIMEOUT * 1000),
+                httpx_async_client=_gemini_http,
+            ),
+        )
+    return _gemini
+
+def hf():
+    """Shared HuggingFace AsyncInferenceClient"""
+    global _hf
+    if _hf is None and HF_TOKEN:
+        from huggingface_hub import AsyncInferenceClient
+
+        # One instance holds one httpx client for its lifetime (huggingface_hub 1.x), so sharing
+        # it keeps HF connections alive between chats too
+        _hf = AsyncInferenceClient(token=HF_TOKEN, timeout=LLM_TIMEOUT, base_url=HF_BASE_URL)
+    return _hf
+
+async def startup():
+    """Create the clients up front so the first chat doesn't pay for it"""
+    try:
+        gemini()
+        hf()
+        log.info("ready", pool=LLM_POOL_SIZE, timeout_s=LLM_TIMEOUT)
+    except Exception as e:
+        log.error("startup error", error=str(e))
+
+async def shutdown():
+    """Close pooled connections"""
+    global _gemini, _gemini_http, _hf
+    if _hf is not None:
+        try:
+            await _hf.close()
+        except Exception as e:
+            log.warning("HF close error", error=str(e))
+    if _gemini_http is not None:
+        await _gemini_http.aclose()
+    _gemini = _gemini_http = _hf = None
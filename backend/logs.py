@@ -0,0 +1,94 @@
+"""Structured, non-blocking logging for the backends.
+
+Request handlers only put a record on an in-memory queue; a background listener thread
+formats it and writes it to stdout, so a slow terminal or log collector never stalls
+the event loop. Extra keyword arguments become fields:
+
+    log = get_logger("Gemini")
+    log.info("model failed", model=model_name, error=str(e))
+
+LOG_FORMAT=json writes one JSON object per line (for log collectors); the default
+"text" format keeps the familiar "[Gemini] model failed model=... error=..." lines.
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+# "text" (human readable) or "json" (one object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+ROOT = "portfolio"
+_listener = None
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        tag = record.name.split(".", 1)[1] if "." in record.name else record.name
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        line = f"[{tag}] {record.getMessage()}" + (f" {fields}" if fields else "")
+        if record.levelno >= logging.WARNING:
+            line = f"{record.levelname} {line}"
+        return line
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name.split(".", 1)[-1],
+            "msg": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class FieldLogger(logging.LoggerAdapter):
+    """Logger whose keyword arguments (other than exc_info etc.) are attached as fields"""
+    RESERVED = {"exc_info", "stack_info", "stacklevel", "extra"}
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in self.RESERVED}
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+def setup():
+    """Route everything under the "portfolio" logger through a queue to a listener thread"""
+    global _listener
+    if _listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_stop)
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+    root = logging.getLogger(ROOT)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.propagate = False
+
+def _stop():
+    if _listener is not None:
+        _listener.stop()
+
+def _restart_after_fork():
+    """Threads don't survive fork(): give a pre-forked worker its own queue and listener
+    (a fresh queue, so records the parent hadn't written yet aren't written twice)"""
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.SimpleQueue()
+    for handler in logging.getLogger(ROOT).handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+
+def get_logger(name: str) -> FieldLogger:
+    setup()
+    return FieldLogger(logging.getLogger(f"{ROOT}.{name}"), {})
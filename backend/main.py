@@ -1,10 +1,11 @@
 import os
-print("🚀 BACKEND STARTING...")
-import json
-import requests
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Body
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Body, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -13,7 +14,39 @@ load_dotenv()
 load_dotenv(dotenv_path=".env.local")
 load_dotenv(dotenv_path="../.env.local")
 
-app = FastAPI()
+from ingestion import build_chunks, sync_index, manifest_path_for
+from readiness import Readiness
+from ingest_jobs import IngestJobs
+from github_snapshot import GitHubSnapshot, GitHubError
+from hybrid_retrieval import LexicalIndex, hybrid_search
+from admission import Admission, Overloaded, ADMISSION_CONCURRENCY
+from metrics import timer, monitor_event_loop, publish_metrics, flush as flush_metrics, render as render_metrics, \
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, RETRIEVAL_PATHS
+from logs import get_logger
+
+log = get_logger("Scout")
+log.info("backend starting")
+
+# Set PREWARM=false to keep the old load-on-first-request behaviour (e.g. for quick local runs)
+PREWARM = os.getenv("PREWARM", "true").lower() == "true"
+# Seconds a client is told to wait when it asks before prewarm has finished
+WARMUP_RETRY_AFTER = int(os.getenv("WARMUP_RETRY_AFTER", "5"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup = asyncio.create_task(prewarm()) if PREWARM else None
+    lag_monitor = asyncio.create_task(monitor_event_loop())
+    metrics_publisher = asyncio.create_task(publish_metrics())
+    yield
+    lag_monitor.cancel()
+    metrics_publisher.cancel()
+    # Final snapshot, so this worker's counters survive it being stopped or replaced
+    flush_metrics()
+    if warmup:
+        warmup.cancel()
+    ingest_jobs.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow Next.js to talk to Python backend
 app.add_middleware(
@@ -30,164 +63,243 @@ app.add_middleware(
 )
 
 # --- CONFIGURATION ---
-GITHUB_GRAPHQL_API = "https://api.github.com/graphql"
 INDEX_NAME = os.getenv("PINECONE_INDEX_NAME")
 HF_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN")
+HF_BASE_URL = os.getenv("HF_BASE_URL")
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# "hf" (sentence-transformers on torch) or "onnx" (onnxruntime, no torch needed)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hf").lower()
+# "pinecone" or "local" (in-process NumPy index on disk, no network needed)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone").lower()
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "data/vector_index")
+# Store local vectors as int8 (4x smaller, tiny loss in score precision)
+LOCAL_INDEX_INT8 = os.getenv("LOCAL_INDEX_INT8", "false").lower() == "true"
 
-# Global variables for models (lazy loaded)
+# Global variables for models (lazy loaded, prewarmed at startup)
 _embeddings = None
 _llm = None
+_stores = {}
+# Prewarm and request threads may race for the same model; only one should load it
+_load_lock = threading.RLock()
+
+readiness = Readiness(["embeddings", "vector_store", "llm"])
+ingest_jobs = IngestJobs()
+github = GitHubSnapshot()
+# BM25 over the same chunks as the vector index, rebuilt on every ingest
+lexical = LexicalIndex()
+# Caps concurrent HuggingFace calls (bounded queue, 503 when full) and rate limits each client IP
+admission = Admission({"hf": ADMISSION_CONCURRENCY["hf"]})
 
 def get_embeddings():
     global _embeddings
     if _embeddings is None:
-        print("📥 Importing Embeddings dependencies...")
-        from langchain_huggingface import HuggingFaceEmbeddings
-        print("📥 Initializing Embeddings...")
-        _embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+        with _load_lock:
+            if _embeddings is not None:
+                return _embeddings
+            log.info("importing embeddings dependencies", backend=EMBEDDING_BACKEND)
+            from embeddings import CachedEmbeddings, EMBED_BATCH_SIZE
+            if EMBEDDING_BACKEND == "onnx":
+                with readiness.import_timer("onnx_embeddings"):
+                    from onnx_embeddings import OnnxEmbeddings, EMBED_ONNX_FILE
+                log.info("initializing embeddings")
+                model = OnnxEmbeddings(EMBEDDING_MODEL, batch_size=EMBED_BATCH_SIZE)
+                cache_name = f"{EMBEDDING_MODEL}:{EMBED_ONNX_FILE}"
+            else:
+                with readiness.import_timer("langchain_huggingface"):
+                    from langchain_huggingface import HuggingFaceEmbeddings
+                log.info("initializing embeddings")
+                model = HuggingFaceEmbeddings(
+                    model_name=EMBEDDING_MODEL,
+                    encode_kwargs={"batch_size": EMBED_BATCH_SIZE}
+                )
+                cache_name = EMBEDDING_MODEL
+            # Batched, with a disk cache for documents and an LRU for queries
+            _embeddings = CachedEmbeddings(model, cache_name)
+            readiness.mark_ready("embeddings")
     return _embeddings
 
 def get_llm():
     global _llm
     if _llm is None:
-        print("📥 Importing LLM dependencies...")
-        from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
-        print("📥 Initializing LLM...")
-        llm = HuggingFaceEndpoint(
-            repo_id="mistralai/Mistral-7B-Instruct-v0.2",
-            task="conversational",
-            max_new_tokens=512,
-            huggingfacehub_api_token=HF_TOKEN
-        )
-        _llm = ChatHuggingFace(llm=llm)
+        with _load_lock:
+            if _llm is not None:
+                return _llm
+            log.info("importing LLM dependencies")
+            with readiness.import_timer("langchain_huggingface"):
+                from langchain_huggingface import HuggingFaceEndpoint, ChatHuggingFace
+            log.info("initializing LLM")
+            # HF_BASE_URL points at another OpenAI-compatible server (e.g. the bench stand-ins)
+            model = {"endpoint_url": HF_BASE_URL} if HF_BASE_URL else {"repo_id": "mistralai/Mistral-7B-Instruct-v0.2"}
+            llm = HuggingFaceEndpoint(
+                **model,
+                task="conversational",
+                max_new_tokens=512,
+                huggingfacehub_api_token=HF_TOKEN
+            )
+            _llm = ChatHuggingFace(llm=llm)
+            readiness.mark_ready("llm")
     return _llm
 
 def get_pinecone_store(index_name, embedding):
-    from langchain_pinecone import PineconeVectorStore
-    return PineconeVectorStore(index_name=index_name, embedding=embedding)
+    """Vector store for the configured backend, created once and reused across requests"""
+    key = (VECTOR_BACKEND, index_name)
+    if key not in _stores:
+        with _load_lock:
+            if key in _stores:
+                return _stores[key]
+            if VECTOR_BACKEND == "local":
+                from vector_store import LocalVectorStore
+                path = os.path.join(LOCAL_INDEX_PATH, index_name or "default")
+                _stores[key] = LocalVectorStore(path, embedding, quantize=LOCAL_INDEX_INT8)
+            else:
+                with readiness.import_timer("langchain_pinecone"):
+                    from langchain_pinecone import PineconeVectorStore
+                _stores[key] = PineconeVectorStore(index_name=index_name, embedding=embedding)
+            readiness.mark_ready("vector_store")
+    return _stores[key]
+
+def preload():
+    """Load what workers can share before a pre-fork server forks them (gunicorn.conf.py).
+
+    The embedding weights then sit in pages every worker shares copy-on-write, and a local
+    index is mmapped once. Nothing that owns threads or sockets is created here - no
+    inference (torch's thread pool), no onnxruntime session, no Pinecone client - so each
+    worker builds those itself after the fork (prewarm runs the first inference).
+    """
+    if EMBEDDING_BACKEND != "hf":
+        return
+    embeddings = get_embeddings()
+    if VECTOR_BACKEND == "local":
+        get_pinecone_store(INDEX_NAME, embeddings)
+
+async def prewarm():
+    """Load models in the background so the first visitor doesn't pay for it"""
+    # One real embedding call pulls the weights in and runs the first (slow) inference
+    await readiness.warm("embeddings", lambda: get_embeddings().embed_query("warmup"))
+    await readiness.warm("vector_store", lambda: get_pinecone_store(INDEX_NAME, get_embeddings()))
+    await readiness.warm("llm", get_llm)
+    log.info("prewarm finished", ready=readiness.ready)
 
 @app.get("/")
 async def root():
     return {"status": "online", "message": "Scout API is active"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once every component is loaded, 503 (with per-component state) until then"""
+    return JSONResponse(readiness.report(), status_code=200 if readiness.ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms, retrieval paths, admission counters"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """LLM concurrency, queue depth and rejections, plus rate limiter counters"""
+    return admission.info()
+
 # --- HELPER: GitHub Fetcher (Python Version) ---
-def fetch_github_data():
-    # Load roster config - try current dir and parent dir
-    config_paths = [
-        "roster-portfolio/src/roster_config.json",
-        "../roster-portfolio/src/roster_config.json",
-        "src/roster_config.json"
-    ]
-    
-    config = None
-    for path in config_paths:
-        try:
-            with open(path, "r", encoding='utf-8') as f:
-                config = json.load(f)
-                break
-        except FileNotFoundError:
-            continue
-            
-    if not config:
-        raise Exception(f"Could not find roster_config.json in any of {config_paths}")
-
-    username = config['github_username']
-    
-    # Construct Query
-    repo_queries = ""
-    for player in config['roster']:
-        repo_queries += f"""
-        {player['position']}: repository(owner: "{username}", name: "{player['repo_name']}") {{
-            name
-            description
-            url
-            object(expression: "main:README.md") {{ ... on Blob {{ text }} }}
-        }}
-        """
+def fetch_github_data(force: bool = False):
+    """Profile + repo data from the GitHub snapshot, refreshed first (only moved repos are re-downloaded)"""
+    try:
+        changed = github.refresh(force=force)
+        log.info("GitHub snapshot refreshed", readmes_downloaded=len(changed))
+    except GitHubError as e:
+        if not github.repos:
+            raise
+        log.warning("GitHub refresh failed, using the last snapshot", error=str(e))
 
-    query = f"""
-    query {{
-        user(login: "{username}") {{ bio name login }}
-        {repo_queries}
-    }}
-    """
+    if not github.user:
+        raise Exception("No GitHub data available (set GITHUB_TOKEN and run an ingest)")
 
-    resp = requests.post(
-        GITHUB_GRAPHQL_API,
-        json={"query": query},
-        headers={"Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}"}
-    )
-    
-    if resp.status_code != 200:
-        raise Exception(f"GitHub API Failed: {resp.text}")
-        
-    return resp.json()['data'], config['roster']
+    # Same shape as the GraphQL response build_chunks has always consumed
+    data = {"user": github.user}
+    for player in github.roster:
+        repo = github.repo(player.get("repo_name") or "")
+        if repo:
+            data[player["position"]] = {
+                "name": repo.get("name"),
+                "description": repo.get("description"),
+                "url": repo.get("url"),
+                "object": {"text": repo.get("readme", "")},
+            }
+    return data, github.roster
 
 # --- ENDPOINT 1: INGESTION ---
-@app.get("/api/ingest")
-async def ingest_data():
-    try:
-        print("🏈 Scout is retrieving data...")
-        data, roster = fetch_github_data()
-        
-        texts = []
-        metadatas = []
+def run_ingest(job, full: bool = False) -> dict:
+    """The ingest pipeline, run on the ingest worker pool (never on the event loop)"""
+    job.enter("fetching")
+    log.info("retrieving data", job=job.id)
+    data, roster = fetch_github_data(force=full)
 
-        # 1. Process QB (Bio)
-        qb = data['user']
-        texts.append(f"Candidate: {qb['name']}. Bio: {qb['bio']}")
-        metadatas.append({"source": "profile", "type": "bio"})
+    job.enter("chunking")
+    chunks = build_chunks(data, roster)
+    job.enter("loading_models", chunks=len(chunks))
+    store = get_pinecone_store(INDEX_NAME, get_embeddings())
+    log.info("syncing plays into the playbook", chunks=len(chunks))
 
-        # 2. Process Roster (Projects)
-        from langchain_text_splitters import RecursiveCharacterTextSplitter
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        
-        for player in roster:
-            repo_data = data.get(player['position'])
-            if not repo_data: continue
-            
-            # Combine description + readme
-            readme = repo_data.get('object', {}).get('text', "")
-            full_text = f"Project: {player['display_name']}\nDesc: {repo_data['description']}\nReadme: {readme}"
-            
-            chunks = splitter.split_text(full_text)
-            for chunk in chunks:
-                texts.append(chunk)
-                metadatas.append({
-                    "source": player['repo_name'], 
-                    "type": "project"
-                })
-
-        print(f"🏈 Embedding {len(texts)} plays into the playbook...")
-        
-        # Upsert to Pinecone via LangChain
-        from langchain_pinecone import PineconeVectorStore
-        PineconeVectorStore.from_texts(
-            texts=texts, 
-            embedding=get_embeddings(), 
-            index_name=INDEX_NAME,
-            metadatas=metadatas
-        )
-        
-        return {"status": "success", "message": f"Ingested {len(texts)} chunks."}
+    # Upsert only what changed, keyed by content hash
+    stats = sync_index(store, chunks, manifest_path_for(VECTOR_BACKEND, INDEX_NAME), full=full, progress=job.enter)
+    job.enter("lexical_index")
+    lexical.build(chunks)
+    lexical.save()
+    log.info("ingest finished", **stats)
+    return stats
 
-    except Exception as e:
-        print(e)
-        raise HTTPException(status_code=500, detail=str(e))
+@app.post("/api/ingest", status_code=202)
+async def start_ingest(full: bool = False):
+    """Start a background ingest and return its job ID. ?full=true wipes and rebuilds the index.
+    Only one ingest runs at a time; while one is running its job is returned with 409."""
+    job, started = ingest_jobs.start(lambda job: run_ingest(job, full), full=full)
+    if not started:
+        return JSONResponse({"message": "An ingest is already running", **job.info()}, status_code=409)
+    return {"message": "Ingest started", **job.info()}
+
+@app.get("/api/ingest")
+async def latest_ingest():
+    """Status of the most recent ingest job"""
+    job = ingest_jobs.latest()
+    if job is None:
+        raise HTTPException(status_code=404, detail="No ingest has run yet")
+    return job.info()
+
+@app.get("/api/ingest/{job_id}")
+async def ingest_status(job_id: str):
+    job = ingest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job {job_id}")
+    return job.info()
 
 # --- ENDPOINT 2: CHAT ---
+def retrieve(message: str):
+    """Relevant chunks for a question: BM25 first, vector search only when BM25 isn't sure"""
+    embeddings = get_embeddings()
+    vectorstore = get_pinecone_store(INDEX_NAME, embeddings)
+    # With several workers, the last ingest may have run in another one
+    lexical.reload_if_changed()
+    return hybrid_search(message, lexical, vectorstore, embeddings, k=3)
+
 class ChatRequest(BaseModel):
     message: str
 
 @app.post("/api/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request):
+    retry_after = admission.check_rate(http_request)
+    if retry_after:
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(retry_after)})
+    retry_after = admission.shed(["hf"])
+    if retry_after:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(retry_after)})
+    # Waiting would only tie a thread up behind the loader's lock until prewarm is done
+    if PREWARM and readiness.warming("embeddings", "vector_store", "llm"):
+        raise HTTPException(status_code=503, detail="Warming up", headers={"Retry-After": str(WARMUP_RETRY_AFTER)})
+
     try:
-        # Connect to existing index
-        vectorstore = get_pinecone_store(INDEX_NAME, get_embeddings())
-        
-        # Retrieve relevant documents
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-        docs = retriever.invoke(request.message)
+        # Embedding the query and searching both block, so they run off the event loop too
+        docs, retrieval = await asyncio.to_thread(retrieve, request.message)
+        timings = retrieval["timings_ms"]
+        RETRIEVAL_PATHS.inc(path=retrieval["path"])
         
         # Format context from retrieved documents
         context = "\n\n".join([doc.page_content for doc in docs])
@@ -204,17 +316,22 @@ async def chat(request: ChatRequest):
         Answer:
         """
         
-        # Get response from LLM
-        response = get_llm().invoke(prompt)
+        # Get response from LLM (off the event loop, client construction included, so other requests
+        # keep being served while it runs)
+        with timer("llm") as llm_timer:
+            async with admission.slot("hf"):
+                response = await asyncio.to_thread(lambda: get_llm().invoke(prompt))
+        timings["llm"] = llm_timer.ms
         
         # chat model returns a message object, so we need .content
         res_text = response.content if hasattr(response, 'content') else str(response)
         
-        return {"response": res_text}
+        return {"response": res_text, "retrieval": retrieval["path"], "timings_ms": timings}
 
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        log.exception("chat failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
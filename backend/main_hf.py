@@ -1,17 +1,57 @@
 import os
-from typing import Optional
-from fastapi import FastAPI
+import json
+import time
+import asyncio
+from functools import lru_cache, partial
+from contextlib import asynccontextmanager, aclosing
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-import re
 
 load_dotenv()
 load_dotenv(dotenv_path=".env.local")
 load_dotenv(dotenv_path="../.env.local")
 load_dotenv(dotenv_path="../.env")  # Load from parent .env
 
-app = FastAPI()
+from model_router import ModelRouter
+from answer_cache import AnswerCache, cache_key, content_hash, normalize_message
+from singleflight import SingleFlight
+from session_store import SessionStore
+from context_assembler import ContextAssembler, split_sections
+from project_registry import ProjectRegistry, PROJECT_REFRESH_INTERVAL
+from intent_router import IntentRouter
+from sanitizer import Sanitizer, clean_response
+from admission import Admission, Overloaded
+from metrics import timer, monitor_event_loop, publish_metrics, flush as flush_metrics, render as render_metrics, \
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, STAGE_SECONDS, LLM_ATTEMPT_SECONDS, LLM_FALLBACKS, CACHE_REQUESTS
+from logs import get_logger
+import llm_clients  # reads API keys and pool settings from the env loaded above
+
+log = get_logger("Chat")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled set of LLM clients for the whole process
+    await llm_clients.startup()
+    # Answers persisted under an older resume are no longer valid
+    dropped = answer_cache.invalidate(keep_base_hash=DIXON_CONTEXT_HASH)
+    if dropped:
+        log.info("dropped answers from a previous resume context", dropped=dropped)
+    refresher = asyncio.create_task(refresh_projects())
+    lag_monitor = asyncio.create_task(monitor_event_loop())
+    metrics_publisher = asyncio.create_task(publish_metrics())
+    yield
+    lag_monitor.cancel()
+    metrics_publisher.cancel()
+    # Final snapshot, so this worker's counters survive it being stopped or replaced
+    flush_metrics()
+    refresher.cancel()
+    await llm_clients.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,9 +66,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# API Keys
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-HF_TOKEN = os.getenv("HUGGINGFACEHUB_API_TOKEN")
+# API Keys (read once, by the module that builds the clients)
+GEMINI_API_KEY = llm_clients.GEMINI_API_KEY
+HF_TOKEN = llm_clients.HF_TOKEN
+# Shared secret for admin endpoints (same token the frontend uses for /api/revalidate)
+REVALIDATE_TOKEN = os.getenv("REVALIDATE_TOKEN")
 
 # Gemini models to try (primary)
 GEMINI_MODELS = [
@@ -44,6 +86,32 @@ HF_MODELS = [
     "meta-llama/Llama-3.2-3B-Instruct",
 ]
 
+# Every model in the fallback chain, keyed by the label reported to clients
+MODEL_CHAIN = {
+    **{f"Gemini ({model})": ("gemini", model) for model in GEMINI_MODELS},
+    **{f"HuggingFace ({model})": ("hf", model) for model in HF_MODELS},
+}
+
+# Reorders MODEL_CHAIN by observed latency and skips models whose circuit is open
+router = ModelRouter(list(MODEL_CHAIN))
+# Per-provider concurrency caps with bounded queues, plus per-IP rate limits
+admission = Admission()
+
+# Hedged fallback: seconds before the next model is started alongside the current one (0 = all at once)
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "2.0"))
+# Overall per-request deadline across every model attempt, in seconds
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "20.0"))
+# Shortest reply accepted (and cached) as an answer, in characters
+MIN_ANSWER_CHARS = 30
+
+# Items of one /api/chat/batch call answered at the same time, and the most items a batch may carry
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "20"))
+# Answer every roster project's summary into the cache whenever project contexts are (re)built
+PRECOMPUTE_PROJECT_SUMMARIES = os.getenv("PRECOMPUTE_PROJECT_SUMMARIES", "false").lower() == "true"
+# The message the frontend sends for a project's AI summary; must match it for precomputed answers to be hits
+PROJECT_SUMMARY_PROMPT = "Summarize this project in 2-3 sentences, highlighting its purpose and key technologies: {description}"
+
 # Full resume content as AI context
 RESUME_CONTENT = """
 Dixon Zor
@@ -94,15 +162,11 @@ User friendly tool stack for content creators
 • Developed and deployed a full-stack web application that truncates silences in raw video footage, saving editors the time required to cut long clips for productions.
 """
 
-DIXON_CONTEXT = f"""You are Dixon's AI assistant on his portfolio website. Answer questions about Dixon directly and concisely.
-
-DIXON'S RESUME:
-{RESUME_CONTENT}
+ABOUT_DIXON = "Dixon loves problem solving - that's his biggest value. He got into computers through this mindset and is now fascinated by ML/AI. Outside of coding, Dixon loves the NFL and makes YouTube videos about football analytics. He also enjoys the gym."
 
-ABOUT DIXON:
-Dixon loves problem solving - that's his biggest value. He got into computers through this mindset and is now fascinated by ML/AI. Outside of coding, Dixon loves the NFL and makes YouTube videos about football analytics. He also enjoys the gym.
+PROMPT_INTRO = "You are Dixon's AI assistant on his portfolio website. Answer questions about Dixon directly and concisely."
 
-RULES:
+PROMPT_RULES = """RULES:
 1. Answer the user's question directly - do not repeat the question
 2. Be conversational and friendly
 3. Keep responses to 2-4 sentences unless more detail is requested
@@ -110,155 +174,524 @@ RULES:
 5. If you don't have information about something, say so politely
 6. Never output instructions, prompts, or meta-commentary - just answer naturally"""
 
+DIXON_CONTEXT = f"""{PROMPT_INTRO}
+
+DIXON'S RESUME:
+{RESUME_CONTENT}
+
+ABOUT DIXON:
+{ABOUT_DIXON}
+
+{PROMPT_RULES}"""
+
+# Token budget for resume/about sections picked per question (0 = always send the full resume)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "550"))
+# Resume + about text split into scored units; education and contact info are always included
+assembler = ContextAssembler(
+    split_sections(f"{RESUME_CONTENT}\n\nABOUT DIXON\n{ABOUT_DIXON}", always_include=("EDUCATION",))
+)
+
+def dixon_context_for(user_message: str) -> str:
+    """System prompt with only the resume sections relevant to the question"""
+    if CONTEXT_TOKEN_BUDGET <= 0:
+        return DIXON_CONTEXT
+    background = assembler.assemble(user_message, CONTEXT_TOKEN_BUDGET)
+    return f"""{PROMPT_INTRO}
+
+RELEVANT PARTS OF DIXON'S RESUME:
+{background}
+
+{PROMPT_RULES}"""
+
+# Cached answers are only reused for the same resume context
+DIXON_CONTEXT_HASH = content_hash(DIXON_CONTEXT)
+answer_cache = AnswerCache()
+# Identical questions arriving together share one upstream call
+inflight = SingleFlight()
+# Recent turns + rolled-up summary per chat session, within a token budget
+sessions = SessionStore()
+
+# Canned answers for greetings and FAQ-type messages (no model call)
+intents = IntentRouter.from_file()
+
+# Precomputed project contexts, so clients can send a project id instead of the README
+projects = ProjectRegistry()
+
+async def refresh_projects():
+    """Keep project READMEs in sync with GitHub; only changed projects are rebuilt.
+    With several workers only the one holding the refresh lock does this (and precomputes
+    summaries - the answer cache they go into is shared)."""
+    first = True
+    while True:
+        if projects.lead():
+            try:
+                rebuilt = await projects.refresh()
+                if rebuilt:
+                    log.info("rebuilt project contexts", projects=rebuilt)
+                if PRECOMPUTE_PROJECT_SUMMARIES and (rebuilt or first):
+                    await precompute_project_summaries()
+            except Exception as e:
+                log.warning("project refresh failed", error=str(e))
+            first = False
+        if PROJECT_REFRESH_INTERVAL <= 0:
+            return
+        await asyncio.sleep(PROJECT_REFRESH_INTERVAL)
+
 class ChatRequest(BaseModel):
     message: str
+    project_id: Optional[str] = None
+    # Raw context, used when project_id is missing or unknown to the registry
     project_context: Optional[str] = None
+    # Client-generated ID; earlier turns of the same session are added to the prompt
+    session_id: Optional[str] = Field(None, max_length=64)
 
-def clean_response(answer: str) -> Optional[str]:
-    """Clean up model response - remove artifacts and formatting issues"""
-    if not answer:
-        return None
-        
-    answer = answer.strip()
-    
-    # Remove common LLM artifacts
-    artifacts_to_remove = [
-        "[/USER]", "[/INST]", "[INST]", "</s>", "<s>",
-        "[/SYS]", "[SYS]", "<<SYS>>", "<</SYS>>",
-        "Human:", "Assistant:", "User:", "AI:",
-        "ANSWER:", "Answer:", "Response:",
+    def resolve_project_context(self) -> Optional[str]:
+        return projects.get(self.project_id) or self.project_context
+
+@lru_cache(maxsize=256)
+def build_context(user_message: str, project_context: Optional[str] = None) -> str:
+    """Build the system prompt for a question, adding the project the user is viewing if provided"""
+    context = dixon_context_for(user_message)
+    if not project_context:
+        return context
+
+    project_prompt = f"""
+
+---
+CURRENT PROJECT CONTEXT:
+The user is currently viewing one of Dixon's projects. Use this information to answer project-specific questions:
+
+{project_context}
+
+When answering questions about this project:
+- Reference specific details from the README if relevant
+- Explain technical choices and technologies used
+- Connect the project to Dixon's skills and experience
+---
+"""
+    return context + project_prompt
+
+def conversation_prompt(history: str) -> str:
+    return f"""
+
+---
+CONVERSATION SO FAR:
+{history}
+
+Use it to resolve follow-up questions ("that project", "tell me more"); don't repeat earlier answers.
+---
+"""
+
+def gemini_config(system_prompt: Optional[str]):
+    from google.genai import types
+
+    return types.GenerateContentConfig(
+        system_instruction=system_prompt,
+        max_output_tokens=500,
+        temperature=0.5
+    )
+
+def chat_messages(user_message: str, system_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_message}
     ]
-    for artifact in artifacts_to_remove:
-        answer = answer.replace(artifact, "")
-    
-    # Remove instruction leakage patterns
-    answer = re.sub(r'Answer this question about Dixon[^:]*:\s*', '', answer, flags=re.IGNORECASE)
-    answer = re.sub(r'\n\s*(what|which|how|where|when|who|why|tell me|describe|explain)[^\n?]*\?\s*\n', '\n', answer, flags=re.IGNORECASE)
-    answer = re.sub(r'\n\s*(what|which|how|where|when|who|why|tell me|describe|explain)[^\n?]*\?\s*$', '', answer, flags=re.IGNORECASE)
-    
-    # Remove leading punctuation
-    answer = answer.strip()
-    while answer and answer[0] in '?!.\n\t ':
-        answer = answer[1:].strip()
-    
-    # Final cleanup
-    answer = re.sub(r'\n{3,}', '\n\n', answer)
-    answer = answer.strip()
-    
-    return answer if len(answer) > 10 else None
 
-def query_gemini(user_message: str, system_prompt: str = None) -> tuple[Optional[str], Optional[str]]:
-    """Query Google Gemini API using google-genai SDK. Returns (response, model_name)"""
-    if not GEMINI_API_KEY:
-        print("[Gemini] No API key configured")
-        return None, None
-    
+async def query_gemini_model(model_name: str, user_message: str, system_prompt: str = None) -> Optional[str]:
+    """Query a single Gemini model. Returns the cleaned response or None; raises on API errors"""
+    client = llm_clients.gemini()
+    if client is None:
+        raise RuntimeError("Gemini API key not configured")
+
     try:
-        from google import genai
-        from google.genai import types
-        
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        
-        # Try each Gemini model
-        for model_name in GEMINI_MODELS:
-            try:
-                print(f"[Gemini] Trying model: {model_name}")
-                
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=user_message,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_prompt,
-                        max_output_tokens=500,
-                        temperature=0.5
-                    )
-                )
-                
-                answer = response.text
-                answer = clean_response(answer)
-                
-                if answer and len(answer) > 10:
-                    print(f"[Gemini] Success with {model_name}: {answer[:100]}...")
-                    return answer, model_name
-                    
-            except Exception as model_error:
-                print(f"[Gemini] {model_name} failed: {model_error}")
-                continue
-        
-        return None, None
-        
+        log.debug("trying model", provider="gemini", model=model_name)
+        response = await client.aio.models.generate_content(
+            model=model_name,
+            contents=user_message,
+            config=gemini_config(system_prompt)
+        )
+
+        with timer("clean_response"):
+            answer = clean_response(response.text)
+        log.debug("model answered", provider="gemini", model=model_name, chars=len(answer or ""))
+        return answer
+
     except Exception as e:
-        print(f"[Gemini] Error: {e}")
-        return None, None
+        log.warning("model failed", provider="gemini", model=model_name, error=str(e))
+        raise
 
-def query_hf_chat(user_message: str, system_prompt: str, model: str = None) -> Optional[str]:
-    """Query HuggingFace as fallback"""
-    if not HF_TOKEN:
-        print("[HF] No API key configured")
-        return None
+async def query_hf_chat(user_message: str, system_prompt: str, model: str = None) -> Optional[str]:
+    """Query HuggingFace as fallback. Returns the cleaned response or None; raises on API errors"""
+    client = llm_clients.hf()
+    if client is None:
+        raise RuntimeError("HuggingFace token not configured")
     
     model = model or HF_MODELS[0]
     
     try:
-        from huggingface_hub import InferenceClient
-        
-        client = InferenceClient(token=HF_TOKEN)
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_message}
-        ]
-        
-        print(f"[HF Chat] Model: {model}")
-        response = client.chat_completion(
-            messages=messages,
+        log.debug("trying model", provider="hf", model=model)
+        response = await client.chat_completion(
+            messages=chat_messages(user_message, system_prompt),
             model=model,
             max_tokens=500,
             temperature=0.5
         )
         
         answer = response.choices[0].message.content
-        answer = clean_response(answer)
-        
-        print(f"[HF Chat] Response: {answer[:100] if answer else 'None'}...")
+        with timer("clean_response"):
+            answer = clean_response(answer)
+
+        log.debug("model answered", provider="hf", model=model, chars=len(answer or ""))
         return answer
         
     except Exception as e:
-        print(f"[HF Chat] Error with {model}: {e}")
+        log.warning("model failed", provider="hf", model=model, error=str(e))
+        raise
+
+async def stream_gemini(model_name: str, user_message: str, system_prompt: str = None) -> AsyncIterator[str]:
+    """Stream a single Gemini model's reply as text chunks"""
+    client = llm_clients.gemini()
+    if client is None:
+        raise RuntimeError("Gemini API key not configured")
+
+    log.debug("streaming model", provider="gemini", model=model_name)
+    stream = await client.aio.models.generate_content_stream(
+        model=model_name,
+        contents=user_message,
+        config=gemini_config(system_prompt)
+    )
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+async def stream_hf_chat(user_message: str, system_prompt: str, model: str = None) -> AsyncIterator[str]:
+    """Stream a HuggingFace chat completion as text chunks"""
+    client = llm_clients.hf()
+    if client is None:
+        raise RuntimeError("HuggingFace token not configured")
+
+    model = model or HF_MODELS[0]
+
+    log.debug("streaming model", provider="hf", model=model)
+    stream = await client.chat_completion(
+        messages=chat_messages(user_message, system_prompt),
+        model=model,
+        max_tokens=500,
+        temperature=0.5,
+        stream=True
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_chat_events(user_message: str, system_prompt: str, key: Optional[str] = None,
+                             cached: Optional[dict] = None, session_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield SSE events for a chat reply (the cached one if given) from the best-ranked model that produces text;
+    a complete reply is appended to `session_id`'s history"""
+    start = time.perf_counter()
+    first_token_at = None
+
+    if cached:
+        yield sse_event("token", {"text": cached["response"]})
+        yield sse_event("done", {
+            "model": cached["model"],
+            "cached": True,
+            "ttft_ms": round((time.perf_counter() - start) * 1000, 1),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+        return
+    full_text = []
+
+    cleaner = Sanitizer()
+    model_used = None
+    overloaded: list[Overloaded] = []
+    # Set when a model fails after its text started going out; the reply is cut short
+    interrupted = False
+
+    # Models are tried in router order; only one that hasn't sent any text yet can fall through
+    async def sources():
+        nonlocal interrupted
+        attempts = 0
+        for label in available_models():
+            if not router.start(label):
+                continue
+            if attempts:
+                LLM_FALLBACKS.inc(reason="overloaded" if overloaded else "failure")
+            attempts += 1
+            provider, model = MODEL_CHAIN[label]
+            stream = stream_gemini(model, user_message, system_prompt) if provider == "gemini" \
+                else stream_hf_chat(user_message, system_prompt, model)
+            attempt_start = time.perf_counter()
+            sent = False
+            try:
+                async with admission.slot(provider):
+                    async for text in stream:
+                        sent = True
+                        yield label, text
+            except Overloaded as e:
+                # Provider is busy, not broken: try the next one without counting a failure
+                router.release(label)
+                overloaded.append(e)
+                LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, model=label, outcome="overloaded")
+                continue
+            except Exception as e:
+                log.warning("stream failed", model=label, sent=sent, error=str(e))
+                router.record_failure(label, time.perf_counter() - attempt_start, type(e).__name__)
+                LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, model=label, outcome="error")
+                if sent:
+                    interrupted = True
+                    return
+                continue
+            except BaseException:
+                # Cancelled or closed mid-stream (client went away): no outcome, but a half-open
+                # probe must not stay claimed
+                router.release(label)
+                LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, model=label, outcome="cancelled")
+                raise
+            if sent:
+                router.record_success(label, time.perf_counter() - attempt_start)
+                LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, model=label, outcome="success")
+                return
+            router.record_failure(label, time.perf_counter() - attempt_start, "EmptyResponse")
+            LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - attempt_start, model=label, outcome="empty")
+
+    # Closed with this generator, so an abandoned stream releases its model right away
+    async with aclosing(sources()) as chunks:
+        async for model_label, chunk in chunks:
+            model_used = model_label
+            text = cleaner.feed(chunk)
+            if text:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    STAGE_SECONDS.observe(first_token_at - start, stage="stream_ttft")
+                full_text.append(text)
+                yield sse_event("token", {"text": text})
+
+    text = cleaner.finish()
+    if text:
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        full_text.append(text)
+        yield sse_event("token", {"text": text})
+
+    # Only a complete reply is cached or kept; a cut-off one would be served until it expires
+    response = clean_response("".join(full_text)) if model_used is not None and not interrupted else ""
+    if key and response and len(response) > MIN_ANSWER_CHARS:
+        await asyncio.to_thread(answer_cache.put, key, {"response": response, "model": model_used},
+                                base_hash=DIXON_CONTEXT_HASH)
+    if session_id and response:
+        await asyncio.to_thread(sessions.append, session_id, user_message, response)
+
+    if interrupted:
+        # Not "done": the client must know the text it has is incomplete and can retry
+        yield sse_event("error", {
+            "error": "stream interrupted",
+            "message": "The answer was cut off. Please try again.",
+            "model": model_used,
+        })
+        return
+    if model_used is None and overloaded:
+        yield sse_event("error", {
+            "error": "Overloaded",
+            "message": "The assistant is busy right now. Please try again shortly.",
+            "retry_after": min(e.retry_after for e in overloaded),
+        })
+        return
+    if model_used is None:
+        yield sse_event("error", {
+            "error": "AI model unavailable",
+            "message": "Unable to connect to AI models. Please try again later.",
+        })
+        return
+
+    yield sse_event("done", {
+        "model": model_used,
+        "ttft_ms": round((first_token_at - start) * 1000, 1) if first_token_at else None,
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+    })
+
+def configured_providers() -> list[str]:
+    return [provider for provider, key in (("gemini", GEMINI_API_KEY), ("hf", HF_TOKEN)) if key]
+
+def available_models() -> list[str]:
+    """Configured models in router order (fastest healthy first)"""
+    configured = configured_providers()
+    # Ranked among configured models only: an unconfigured provider's circuit never opens, so it
+    # would keep the all-open probe from ever firing
+    return router.ranked([label for label, (provider, _) in MODEL_CHAIN.items() if provider in configured])
+
+def model_call(label: str, user_message: str, system_prompt: str) -> Callable[[], Awaitable[Optional[str]]]:
+    provider, model = MODEL_CHAIN[label]
+    if provider == "gemini":
+        query = partial(query_gemini_model, model, user_message, system_prompt)
+    else:
+        query = partial(query_hf_chat, user_message, system_prompt, model)
+
+    async def call() -> Optional[str]:
+        async with admission.slot(provider):
+            return await query()
+    return call
+
+async def attempt_model(label: str, call: Callable[[], Awaitable[Optional[str]]], min_length: int) -> Optional[str]:
+    """Run one model call and report its outcome to the router"""
+    start = time.perf_counter()
+    try:
+        answer = await call()
+    except asyncio.CancelledError:
+        router.release(label)
+        LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - start, model=label, outcome="cancelled")
+        raise
+    except Overloaded:
+        router.release(label)
+        LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - start, model=label, outcome="overloaded")
+        raise
+    except Exception as e:
+        router.record_failure(label, time.perf_counter() - start, type(e).__name__)
+        LLM_ATTEMPT_SECONDS.observe(time.perf_counter() - start, model=label, outcome="error")
         return None
 
+    elapsed = time.perf_counter() - start
+    if answer and len(answer) > min_length:
+        router.record_success(label, elapsed)
+        LLM_ATTEMPT_SECONDS.observe(elapsed, model=label, outcome="success")
+        return answer
+    router.record_failure(label, elapsed, "EmptyResponse")
+    LLM_ATTEMPT_SECONDS.observe(elapsed, model=label, outcome="empty")
+    return None
+
+async def race_models(user_message: str, system_prompt: str, min_length: int = MIN_ANSWER_CHARS) -> tuple[Optional[str], Optional[str]]:
+    """Hedged execution of the fallback chain. Returns (response, model_label).
+
+    Starts the best-ranked model, then launches the next candidate every LLM_HEDGE_DELAY seconds
+    (or as soon as a running one fails). The first reply that survives clean_response wins and
+    the rest are cancelled. Gives up after LLM_DEADLINE seconds overall. Raises Overloaded if
+    no model answered and at least one was turned away by admission control.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_DEADLINE
+    remaining = iter(available_models())
+    pending: dict[asyncio.Task, str] = {}
+    started: dict[asyncio.Task, float] = {}
+    overloaded: Optional[Overloaded] = None
+
+    def launch() -> bool:
+        for label in remaining:
+            if router.start(label):
+                call = model_call(label, user_message, system_prompt)
+                task = asyncio.ensure_future(attempt_model(label, call, min_length))
+                pending[task] = label
+                started[task] = loop.time()
+                return True
+        return False
+
+    exhausted = not launch()
+    next_hedge = loop.time() + LLM_HEDGE_DELAY
+    try:
+        while pending:
+            now = loop.time()
+            if now >= deadline:
+                log.warning("deadline reached", deadline_s=LLM_DEADLINE, in_flight=len(pending))
+                # Only the longest-running attempt is charged with the timeout; later hedges had less
+                # than the deadline and end with no outcome (a task cancelled before it ever ran
+                # would not release its probe itself)
+                primary, *hedges = pending
+                router.record_failure(pending[primary], now - started[primary], "DeadlineExceeded")
+                for task in hedges:
+                    router.release(pending[task])
+                break
+            timeout = deadline - now if exhausted else min(deadline, next_hedge) - now
+            done, _ = await asyncio.wait(pending, timeout=max(timeout, 0), return_when=asyncio.FIRST_COMPLETED)
+
+            failed = False
+            for task in done:
+                label = pending.pop(task)
+                try:
+                    answer = task.result()
+                except Overloaded as e:
+                    overloaded, answer = e, None
+                if answer:
+                    return answer, label
+                failed = True
+
+            # Hedge when the timer fires, or immediately when an in-flight model fails
+            if not exhausted and (failed or loop.time() >= next_hedge):
+                exhausted = not launch()
+                if not exhausted:
+                    LLM_FALLBACKS.inc(reason="failure" if failed else "hedge")
+                next_hedge = loop.time() + LLM_HEDGE_DELAY
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if overloaded:
+        raise overloaded
+    return None, None
+
 @app.get("/")
 async def root():
     return {
         "status": "running",
         "service": "Dixon's Portfolio AI",
-        "primary_model": f"Gemini ({GEMINI_MODEL})",
+        "primary_model": next(iter(available_models()), None),
         "gemini_configured": bool(GEMINI_API_KEY),
         "hf_fallback": bool(HF_TOKEN)
     }
 
+@app.get("/models/health")
+async def models_health():
+    """Router state per model: circuit state, success rate, latency EWMA and recent errors"""
+    return router.health()
+
+@app.get("/projects")
+async def list_projects():
+    """Projects that can be referenced by project_id, and the size of their stored context"""
+    return projects.info()
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Answer cache hit/miss counters and size, plus request coalescing counters"""
+    return {**answer_cache.info(), "coalescing": inflight.info()}
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Chat session count, approximate memory, rollups and evictions"""
+    return sessions.info()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage and per-model latency histograms, fallbacks, cache outcomes, admission"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Per-provider concurrency, queue depth and rejections, plus rate limiter counters"""
+    return admission.info()
+
+@app.post("/cache/invalidate")
+async def cache_invalidate(token: Optional[str] = None, x_revalidate_token: Optional[str] = Header(None)):
+    """Clear cached answers, e.g. after the resume or project READMEs change"""
+    if not REVALIDATE_TOKEN or REVALIDATE_TOKEN not in (token, x_revalidate_token):
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return {"success": True, "removed": await asyncio.to_thread(answer_cache.invalidate)}
+
 @app.get("/test-hf")
 async def test_models():
     """Test AI model connections"""
-    # Try Gemini first
-    response = query_gemini("Briefly introduce Dixon based on his resume.", DIXON_CONTEXT)
+    try:
+        response, model = await race_models("Briefly introduce Dixon based on his resume.", DIXON_CONTEXT, min_length=10)
+    except Overloaded as e:
+        return {"status": "overloaded", "message": str(e), "retry_after": e.retry_after}
     if response:
         return {
             "status": "connected",
-            "model": f"Gemini ({GEMINI_MODEL})",
+            "model": model,
             "response": response[:200]
         }
     
-    # Fall back to HuggingFace
-    for model in HF_MODELS:
-        response = query_hf_chat("Briefly introduce Dixon based on his resume.", DIXON_CONTEXT, model)
-        if response:
-            return {
-                "status": "connected",
-                "model": f"HuggingFace ({model})",
-                "response": response[:200]
-            }
-    
     return {
         "status": "failed", 
         "message": "All models failed", 
@@ -266,39 +699,53 @@ async def test_models():
         "hf_token": bool(HF_TOKEN)
     }
 
-@app.post("/api/chat")
-async def chat(request: ChatRequest):
-    """Chat endpoint - Gemini primary, HuggingFace fallback"""
-    context = DIXON_CONTEXT
-    
-    # Add project context if provided
-    if request.project_context:
-        project_prompt = f"""
+def check_rate_limit(http_request: Request):
+    """429 if this client is over its rate limit"""
+    retry_after = admission.check_rate(http_request)
+    if retry_after:
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(retry_after)})
 
----
-CURRENT PROJECT CONTEXT:
-The user is currently viewing one of Dixon's projects. Use this information to answer project-specific questions:
+def shed_load():
+    """503 before doing any work if every provider's queue is already full"""
+    retry_after = admission.shed(configured_providers())
+    if retry_after:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(retry_after)})
 
-{request.project_context}
+async def answer_chat(request: ChatRequest, history: str = "") -> dict:
+    """Intent table, answer cache, then the model race. `history` is a session's earlier
+    turns; answers that depend on it bypass the shared cache. Raises Overloaded (or a 503
+    from load shedding) when no provider can take the call."""
+    # Greetings, thanks and FAQ-type messages are answered from the intent table
+    match = intents.fast_answer(request.message)
+    if match:
+        CACHE_REQUESTS.inc(outcome="intent")
+        return {"response": match.response, "model": f"intent:{match.name}"}
 
-When answering questions about this project:
-- Reference specific details from the README if relevant
-- Explain technical choices and technologies used
-- Connect the project to Dixon's skills and experience
----
-"""
-        context = DIXON_CONTEXT + project_prompt
-    
-    # Try Gemini first (primary)
-    response = query_gemini(request.message, context)
-    if response and len(response) > 30:
-        return {"response": response, "model": f"Gemini ({GEMINI_MODEL})"}
+    with timer("context"):
+        context = build_context(request.message, request.resolve_project_context())
+        if history:
+            context += conversation_prompt(history)
+
+    key = cache_key(request.message, context)
+    # The sqlite tier blocks, so cache reads and writes run off the event loop
+    cached = None if history else await asyncio.to_thread(answer_cache.get, key)
+    if cached:
+        CACHE_REQUESTS.inc(outcome="hit")
+        return {**cached, "cached": True}
+    CACHE_REQUESTS.inc(outcome="session" if history else "miss")
+    shed_load()
     
-    # Fall back to HuggingFace models
-    for model in HF_MODELS:
-        response = query_hf_chat(request.message, context, model)
-        if response and len(response) > 30:
-            return {"response": response, "model": f"HuggingFace ({model})"}
+    # Gemini primary, HuggingFace fallback - raced with hedging so failures don't stack up
+    async def answer():
+        response, model = await race_models(request.message, context)
+        if response and not history:
+            await asyncio.to_thread(answer_cache.put, key, {"response": response, "model": model},
+                                    base_hash=DIXON_CONTEXT_HASH)
+        return response, model
+
+    response, model = await inflight.do(key, answer)
+    if response:
+        return {"response": response, "model": model}
     
     # If all models fail, return error
     return {
@@ -308,12 +755,135 @@ When answering questions about this project:
         "hf_configured": bool(HF_TOKEN)
     }
 
+@app.post("/api/chat")
+async def chat(request: ChatRequest, http_request: Request):
+    """Chat endpoint - Gemini primary, HuggingFace fallback"""
+    check_rate_limit(http_request)
+    history = await asyncio.to_thread(sessions.history, request.session_id) if request.session_id else ""
+    try:
+        result = await answer_chat(request, history)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail="Server busy", headers={"Retry-After": str(e.retry_after)})
+    if request.session_id and result.get("response"):
+        await asyncio.to_thread(sessions.append, request.session_id, request.message, result["response"])
+    return result
+
+async def answer_batch(items: List[ChatRequest], concurrency: int = CHAT_BATCH_CONCURRENCY) -> list[dict]:
+    """Answer items `concurrency` at a time; identical items (same normalized message and
+    project context) are answered once. Results are in item order, one per item, each with
+    its model, latency and error - a failed item never fails the others."""
+    unique: dict[tuple, int] = {}
+    slots = [unique.setdefault((normalize_message(item.message), item.resolve_project_context()), len(unique))
+             for item in items]
+    firsts = {slot: item for slot, item in reversed(list(zip(slots, items)))}
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: ChatRequest) -> dict:
+        async with limit:
+            start = time.perf_counter()
+            try:
+                result = await answer_chat(item)
+            except Overloaded as e:
+                result = {"error": "Server busy", "retry_after": e.retry_after}
+            except HTTPException as e:
+                result = {"error": e.detail, "retry_after": int((e.headers or {}).get("Retry-After", 0)) or None}
+            except Exception as e:
+                log.error("batch item failed", error=str(e))
+                result = {"error": "Internal error"}
+            return {"response": None, "model": None, "error": None, **result,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    answers = await asyncio.gather(*(run(firsts[slot]) for slot in range(len(unique))))
+    return [{**answers[slot], "deduped": slot in slots[:i]} for i, slot in enumerate(slots)]
+
+class ChatBatchRequest(BaseModel):
+    items: List[ChatRequest]
+
+@app.post("/api/chat/batch")
+async def chat_batch(request: ChatBatchRequest, http_request: Request):
+    """Several chat items in one call, e.g. every project summary on page load. Counts as one
+    request against the rate limit; upstream calls still go through admission control."""
+    check_rate_limit(http_request)
+    if len(request.items) > CHAT_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {CHAT_BATCH_MAX_ITEMS} items per batch")
+    with timer("batch") as batch_timer:
+        results = await answer_batch(request.items)
+    return {"results": results, "unique": sum(not r["deduped"] for r in results), "total_ms": batch_timer.ms}
+
+def project_summary_items() -> List[ChatRequest]:
+    """The summary request the frontend makes for each roster project"""
+    items = []
+    for key, player in projects.roster.items():
+        description = (projects.github.repo(key) or {}).get("description") or player["display_name"]
+        items.append(ChatRequest(message=PROJECT_SUMMARY_PROMPT.format(description=description),
+                                 project_id=player["repo_name"]))
+    return items
+
+async def precompute_project_summaries() -> list[dict]:
+    """Answer every project summary ahead of time so the frontend's requests are cache hits"""
+    items = project_summary_items()
+    results = await answer_batch(items)
+    failed = [item.project_id for item, result in zip(items, results) if result["error"]]
+    log.info("precomputed project summaries", projects=len(items), failed=len(failed))
+    return results
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Streaming chat endpoint - sends tokens as Server-Sent Events, then a final 'done' event
+    ('error' instead if no model answered or the answer was cut off mid-stream)"""
+    check_rate_limit(http_request)
+    match = intents.fast_answer(request.message)
+    if match:
+        CACHE_REQUESTS.inc(outcome="intent")
+        if request.session_id:
+            await asyncio.to_thread(sessions.append, request.session_id, request.message, match.response)
+        return StreamingResponse(
+            iter([sse_event("token", {"text": match.response}),
+                  sse_event("done", {"model": f"intent:{match.name}", "ttft_ms": 0.0, "total_ms": 0.0})]),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    history = await asyncio.to_thread(sessions.history, request.session_id) if request.session_id else ""
+    with timer("context"):
+        context = build_context(request.message, request.resolve_project_context())
+        if history:
+            context += conversation_prompt(history)
+    # As in answer_chat, answers that depend on a session's history bypass the shared cache
+    key = None if history else cache_key(request.message, context)
+    cached = await asyncio.to_thread(answer_cache.get, key) if key else None
+    CACHE_REQUESTS.inc(outcome="hit" if cached else "session" if history else "miss")
+    if not cached:
+        shed_load()
+    return StreamingResponse(
+        stream_chat_events(request.message, context, key, cached, request.session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def precompute_offline():
+    """`python main_hf.py --precompute-summaries`: refresh project contexts and fill the answer
+    cache's sqlite tier (ANSWER_CACHE_DB) with every project summary, without serving"""
+    if not answer_cache.db_path:
+        log.warning("ANSWER_CACHE_DB is not set; precomputed summaries will not outlive this run")
+    await llm_clients.startup()
+    try:
+        await projects.refresh()
+        for item, result in zip(project_summary_items(), await precompute_project_summaries()):
+            print(f"  {item.project_id}: {result['error'] or result['model']} ({result['latency_ms']} ms)")
+    finally:
+        await llm_clients.shutdown()
+
 if __name__ == "__main__":
+    import sys
+    if "--precompute-summaries" in sys.argv:
+        asyncio.run(precompute_offline())
+        sys.exit(0)
     import uvicorn
     print("=" * 50)
     print("  Dixon's Portfolio AI Backend")
     print("=" * 50)
-    print(f"  Primary: Gemini ({GEMINI_MODEL}) {'✓' if GEMINI_API_KEY else '✗'}")
+    print(f"  Primary: Gemini ({GEMINI_MODELS[0]}) {'✓' if GEMINI_API_KEY else '✗'}")
     print(f"  Fallback: HuggingFace {'✓' if HF_TOKEN else '✗'}")
     print(f"  Resume Context: ✓ Loaded ({len(RESUME_CONTENT)} chars)")
     print("=" * 50)
@@ -0,0 +1,172 @@
+"""Markdown-aware chunking for README ingestion.
+
+READMEs are cleaned first: badges, images, HTML, comments and boilerplate sections
+(license, contributing, table of contents, ...) are dropped, and long code blocks are
+capped. The text is then split on headings so every chunk stays inside one section and
+carries its heading path ("Setup > Docker") as metadata. Sections that are too long are
+packed paragraph by paragraph up to the chunk size. Exact and near-duplicate chunks are
+removed before anything reaches the embedding model.
+"""
+import os
+import re
+import hashlib
+from typing import Iterable
+
+# Max characters per chunk (same budget as the old RecursiveCharacterTextSplitter)
+MD_CHUNK_SIZE = int(os.getenv("MD_CHUNK_SIZE", "500"))
+# Chunks shorter than this (after cleaning) carry too little to be worth an embedding
+MD_MIN_CHUNK_CHARS = int(os.getenv("MD_MIN_CHUNK_CHARS", "40"))
+# Lines kept from each fenced code block
+MD_CODE_MAX_LINES = int(os.getenv("MD_CODE_MAX_LINES", "8"))
+# Word-shingle Jaccard similarity above which two chunks count as duplicates
+MD_NEAR_DUP_THRESHOLD = float(os.getenv("MD_NEAR_DUP_THRESHOLD", "0.8"))
+
+# Sections whose content never answers a question about the project
+BOILERPLATE_HEADINGS = re.compile(
+    r"^(licen[cs]e|contributing|contributors|contribution guidelines|code of conduct|"
+    r"table of contents|contents|toc|acknowledge?ments?|credits|support|sponsors?|"
+    r"star history|badges|authors?)\b",
+    re.IGNORECASE,
+)
+HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+
+def _clean_inline(text: str) -> str:
+    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
+    text = re.sub(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)", "", text)    # linked badges
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)                 # images
+    text = re.sub(r"!\[[^\]]*\]\[[^\]]*\]", "", text)                # reference images
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)             # links -> link text
+    text = re.sub(r"<img[^>]*>", "", text, flags=re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", "", text)                               # other html tags
+    text = re.sub(r"&nbsp;", " ", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return text
+
+def _heading_title(title: str) -> str:
+    # Headings often carry emoji or badges; keep the words
+    return re.sub(r"[^\w\s.+#/&()-]", "", _clean_inline(title)).strip()
+
+def split_markdown(text: str, max_code_lines: int = MD_CODE_MAX_LINES) -> list[tuple[list[str], str]]:
+    """Cleaned (heading path, body) sections in document order; boilerplate sections dropped"""
+    sections = []
+    path: list[tuple[int, str]] = []
+    body: list[str] = []
+    skip_level = None
+    in_code, code_lines = False, 0
+
+    def flush():
+        content = re.sub(r"\n\s*\n+", "\n\n", "\n".join(body)).strip()
+        if content and skip_level is None:
+            sections.append(([title for _, title in path], content))
+        body.clear()
+
+    for line in text.replace("\r\n", "\n").split("\n"):
+        if FENCE.match(line):
+            if in_code and code_lines > max_code_lines:
+                body.append("...")
+            in_code, code_lines = not in_code, 0
+            body.append(line.strip())
+            continue
+        if in_code:
+            code_lines += 1
+            if code_lines <= max_code_lines:
+                body.append(line)
+            continue
+
+        match = HEADING.match(line)
+        if match:
+            flush()
+            level, title = len(match.group(1)), _heading_title(match.group(2))
+            if skip_level is not None and level <= skip_level:
+                skip_level = None
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, title))
+            if skip_level is None and BOILERPLATE_HEADINGS.match(title):
+                skip_level = level
+            continue
+
+        line = _clean_inline(line).rstrip()
+        # Horizontal rules and lines left empty by badge removal
+        if re.fullmatch(r"\s*([-*_]\s*){3,}", line):
+            continue
+        body.append(line)
+
+    flush()
+    return sections
+
+def _pack(content: str, size: int) -> list[str]:
+    """Split one section into pieces of at most `size` chars, on paragraph, then sentence, then word boundaries"""
+    if len(content) <= size:
+        return [content]
+    pieces, current = [], ""
+    units = []
+    for paragraph in content.split("\n\n"):
+        if len(paragraph) <= size:
+            units.append(paragraph)
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            while len(sentence) > size:
+                cut = sentence.rfind(" ", 0, size)
+                cut = cut if cut > 0 else size
+                units.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            units.append(sentence)
+    for unit in units:
+        if current and len(current) + len(unit) + 2 > size:
+            pieces.append(current)
+            current = unit
+        else:
+            current = f"{current}\n\n{unit}" if current else unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _shingles(text: str, n: int = 3) -> set:
+    words = re.findall(r"\w+", text.lower())
+    return {" ".join(words[i:i + n]) for i in range(max(len(words) - n + 1, 1))}
+
+def _normalized(text: str) -> str:
+    return re.sub(r"\W", "", text.lower())
+
+def _repeats_title(heading: str, title: str) -> bool:
+    """Whether a heading just restates the title ("Football-AI" under "Project: Football AI"):
+    the whole title or its last words, ignoring case and punctuation"""
+    words = re.findall(r"\w+", title.lower())
+    return _normalized(heading) in {"".join(words[i:]) for i in range(len(words))}
+
+def dedupe(chunks: Iterable[tuple[str, object]], threshold: float = MD_NEAR_DUP_THRESHOLD) -> list[tuple[str, object]]:
+    """Drop exact and near-duplicate (text, anything) pairs, keeping the first seen. A chunk
+    is a near-duplicate when most of its word shingles already appear in one kept chunk."""
+    kept, seen, kept_shingles = [], set(), []
+    for text, extra in chunks:
+        digest = hashlib.sha256(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+        if digest in seen:
+            continue
+        shingles = _shingles(text)
+        if any(len(shingles & other) / len(shingles) >= threshold for other in kept_shingles):
+            continue
+        seen.add(digest)
+        kept_shingles.append(shingles)
+        kept.append((text, extra))
+    return kept
+
+def chunk_markdown(text: str, title: str = "", size: int = MD_CHUNK_SIZE,
+                   min_chars: int = MD_MIN_CHUNK_CHARS) -> list[tuple[str, str]]:
+    """(chunk text, heading path) pairs for one document, near-duplicates removed. Each
+    chunk is prefixed with the document title and its heading path so it still makes
+    sense on its own."""
+    pieces = []
+    for path, content in split_markdown(text):
+        # The README's own H1 usually just repeats the project name
+        heading = " > ".join(p for p in path if p and not _repeats_title(p, title))
+        budget = max(size - len(title) - len(heading) - 4, 100)
+        pieces.extend((piece, heading) for piece in _pack(content, budget)
+                      if len(_normalized(piece)) >= min_chars)
+
+    chunks = []
+    for piece, heading in dedupe(pieces, MD_NEAR_DUP_THRESHOLD):
+        prefix = " - ".join(p for p in (title, heading) if p)
+        chunks.append((f"{prefix}\n{piece}" if prefix else piece, heading))
+    return chunks
@@ -0,0 +1,264 @@
+"""In-process metrics rendered in the Prometheus text format (GET /metrics).
+
+Counters, gauges and fixed-bucket histograms keyed by label values. Recording is a dict
+lookup and a couple of additions under a lock, so it is cheap enough for the hot path;
+cumulative bucket counts are only worked out when /metrics is scraped. `timer()` is the
+usual way to record a duration:
+
+    with timer("embed"):
+        vector = embeddings.embed_query(question)
+
+With several worker processes (gunicorn.conf.py), set METRICS_DIR: each worker writes a
+snapshot of its metrics there every few seconds, and /metrics on any worker adds them
+all up (gauges only from workers that are still running).
+"""
+import os
+import glob
+import json
+import time
+import asyncio
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+# Seconds; covers in-process stages (ms) up to slow model calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# How often the event loop lag probe runs, in seconds (0 = off)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# Directory shared by the worker processes for metric snapshots (empty = this process only)
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+# Seconds between snapshots; other workers' numbers on /metrics are at most this old
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+PREFIX = "portfolio_"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.lock = threading.Lock()
+        self.values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple([labels.get(name, "") for name in self.labelnames])
+
+    def snapshot(self) -> list:
+        with self.lock:
+            return [[list(key), list(value) if isinstance(value, list) else value] for key, value in self.values.items()]
+
+    def merged(self, snapshots: list[list]) -> dict:
+        """This process's values plus other processes' snapshots, added up"""
+        with self.lock:
+            values = {key: list(value) if isinstance(value, list) else value for key, value in self.values.items()}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                if key not in values:
+                    values[key] = value
+                elif isinstance(value, list):
+                    values[key] = [a + b for a, b in zip(values[key], value)]
+                else:
+                    values[key] += value
+        return values
+
+    def render(self, snapshots: list[list] = ()) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.merged(snapshots).items()):
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        self.observe_key(self._key(labels), value)
+
+    def observe_key(self, key: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                # Per-bucket (not cumulative) counts, then +Inf, then the sum
+                series = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def _samples(self, key: tuple, series: list) -> list[str]:
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series):
+            total += count
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            bucket = _labels(self.labelnames, key, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{bucket} {total}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(round(series[-1], 6))}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {total}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _add(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def render(self, snapshots: list[dict] = ()) -> str:
+        """Text exposition; `snapshots` from other processes are added to this one's values"""
+        lines = []
+        for name, metric in self.metrics.items():
+            # A gauge is a current value, so one from a process that has exited no longer counts
+            parts = [snapshot["metrics"].get(name, []) for snapshot in snapshots
+                     if snapshot["alive"] or metric.kind != "gauge"]
+            lines.extend(metric.render(parts))
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# Shared by both backends; each only fills in the stages it has
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent per request stage", ("stage",))
+LLM_ATTEMPT_SECONDS = REGISTRY.histogram(
+    "llm_attempt_duration_seconds", "Duration of each upstream model attempt", ("model", "outcome"))
+LLM_FALLBACKS = REGISTRY.counter(
+    "llm_fallbacks_total", "Extra model attempts started after the first one", ("reason",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Chat requests by how they were answered", ("outcome",))
+RETRIEVAL_PATHS = REGISTRY.counter(
+    "retrieval_path_total", "Retrievals by path (lexical fast path, hybrid, vector only)", ("path",))
+ADMISSION_ACTIVE = REGISTRY.gauge(
+    "admission_active", "Upstream calls in flight per provider", ("provider",))
+ADMISSION_WAITING = REGISTRY.gauge(
+    "admission_waiting", "Upstream calls queued for a slot per provider", ("provider",))
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected_total", "Requests turned away by admission control", ("provider", "reason"))
+
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "How late a periodic timer fires on the event loop", buckets=LAG_BUCKETS)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class timer:
+    """Context manager timing a block into a histogram; .seconds / .ms are set on exit"""
+    __slots__ = ("histogram", "key", "start", "seconds")
+
+    def __init__(self, stage: Optional[str] = None, histogram: Histogram = STAGE_SECONDS, **labels):
+        self.histogram = histogram
+        self.key = (stage,) if stage and not labels else histogram._key({"stage": stage, **labels})
+        self.seconds = 0.0
+
+    def __enter__(self) -> "timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        self.histogram.observe_key(self.key, self.seconds)
+        return False
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def flush():
+    """Write this process's metrics to METRICS_DIR for the other workers' /metrics"""
+    if not METRICS_DIR:
+        return
+    path = os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(REGISTRY.snapshot(), f)
+    os.replace(f"{path}.tmp", path)
+
+def other_processes() -> list[dict]:
+    """Snapshots left in METRICS_DIR by other processes, including ones that have exited
+    (their counters still count towards the totals)"""
+    snapshots = []
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")) if METRICS_DIR else []:
+        pid = int(os.path.basename(path)[len("metrics-"):-len(".json")])
+        if pid == os.getpid():
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshots.append({"metrics": json.load(f), "alive": _alive(pid)})
+        except (OSError, json.JSONDecodeError):
+            continue
+    return snapshots
+
+def render() -> str:
+    return REGISTRY.render(other_processes())
+
+async def publish_metrics(interval: float = METRICS_FLUSH_INTERVAL):
+    """Flush this worker's snapshot every `interval` seconds (only when METRICS_DIR is set)"""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    while True:
+        flush()
+        await asyncio.sleep(interval)
+
+async def monitor_event_loop(interval: float = LOOP_LAG_INTERVAL):
+    """Sleep `interval` in a loop and record how late each wake-up is (blocking work shows up here)"""
+    if interval <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
@@ -0,0 +1,152 @@
+"""Adaptive ordering of the LLM fallback chain.
+
+Tracks per-model success rate, latency (EWMA) and recent error types, trips a circuit
+breaker on models that keep failing, and ranks the remaining candidates by expected
+latency. Untried models keep their configured order until real numbers come in.
+"""
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from logs import get_logger
+
+log = get_logger("Router")
+
+# Consecutive failures before a model's circuit opens
+ROUTER_FAILURE_THRESHOLD = int(os.getenv("ROUTER_FAILURE_THRESHOLD", "3"))
+# Seconds an open circuit waits before allowing a half-open probe (doubles on each failed probe)
+ROUTER_COOLDOWN = float(os.getenv("ROUTER_COOLDOWN", "30"))
+ROUTER_MAX_COOLDOWN = float(os.getenv("ROUTER_MAX_COOLDOWN", "600"))
+# Smoothing factor for the latency EWMA
+ROUTER_EWMA_ALPHA = float(os.getenv("ROUTER_EWMA_ALPHA", "0.3"))
+# Number of recent calls used for the success rate
+ROUTER_WINDOW = int(os.getenv("ROUTER_WINDOW", "20"))
+# Latency assumed for a model that has never answered, in seconds
+ROUTER_PRIOR_LATENCY = float(os.getenv("ROUTER_PRIOR_LATENCY", "3.0"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ModelStats:
+    def __init__(self):
+        self.calls = 0
+        self.outcomes = deque(maxlen=ROUTER_WINDOW)
+        self.latency_ewma: Optional[float] = None
+        self.recent_errors = deque(maxlen=5)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = ROUTER_COOLDOWN
+        self.probing = False
+
+    @property
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def expected_latency(self) -> float:
+        latency = self.latency_ewma if self.latency_ewma is not None else ROUTER_PRIOR_LATENCY
+        # A model that fails half the time costs roughly twice its latency before a usable answer
+        return latency / max(self.success_rate, 0.1)
+
+class ModelRouter:
+    def __init__(self, models: list[str]):
+        self.order = list(models)
+        self.stats = {model: ModelStats() for model in models}
+
+    def _refresh(self, stats: ModelStats, now: float):
+        if stats.state == OPEN and now - stats.opened_at >= stats.cooldown:
+            stats.state = HALF_OPEN
+            stats.probing = False
+
+    def ranked(self, models: Optional[list[str]] = None) -> list[str]:
+        """Usable models (among `models`, default all), fastest expected first. If every circuit is
+        open, only the one nearest its next probe (as an early probe), or nothing while that probe
+        is in flight."""
+        now = time.monotonic()
+        candidates = [model for model in self.order if models is None or model in models]
+        usable = []
+        for index, model in enumerate(candidates):
+            stats = self.stats[model]
+            self._refresh(stats, now)
+            if stats.state == OPEN or (stats.state == HALF_OPEN and stats.probing):
+                continue
+            usable.append((stats.expected_latency(), index, model))
+
+        if not usable:
+            # Everything is tripped - probe the one closest to its retry time, one request at a time,
+            # rather than sending every request to every broken model
+            if not candidates or any(self.stats[m].probing for m in candidates):
+                return []
+            return [min(candidates, key=lambda m: self.stats[m].opened_at + self.stats[m].cooldown)]
+
+        return [model for _, _, model in sorted(usable)]
+
+    def start(self, model: str) -> bool:
+        """Mark a call as starting. Returns False if a half-open (or open) model already has its probe in flight."""
+        stats = self.stats[model]
+        if stats.state != CLOSED:
+            if stats.probing:
+                return False
+            stats.probing = True
+        return True
+
+    def record_success(self, model: str, latency: float):
+        stats = self.stats[model]
+        stats.calls += 1
+        stats.outcomes.append(1)
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma = ROUTER_EWMA_ALPHA * latency + (1 - ROUTER_EWMA_ALPHA) * stats.latency_ewma
+        stats.consecutive_failures = 0
+        stats.state = CLOSED
+        stats.cooldown = ROUTER_COOLDOWN
+        stats.probing = False
+
+    def record_failure(self, model: str, latency: float, error_type: str):
+        stats = self.stats[model]
+        stats.calls += 1
+        stats.outcomes.append(0)
+        stats.recent_errors.append((time.monotonic(), error_type))
+        stats.consecutive_failures += 1
+
+        if stats.state == HALF_OPEN or (stats.state == OPEN and stats.probing):
+            # Failed probe: back off harder before the next one
+            stats.cooldown = min(stats.cooldown * 2, ROUTER_MAX_COOLDOWN)
+            self._open(stats, model)
+        elif stats.state == CLOSED and stats.consecutive_failures >= ROUTER_FAILURE_THRESHOLD:
+            self._open(stats, model)
+
+    def release(self, model: str):
+        """A call ended without an outcome (e.g. cancelled after another model won)"""
+        self.stats[model].probing = False
+
+    def _open(self, stats: ModelStats, model: str):
+        stats.state = OPEN
+        stats.opened_at = time.monotonic()
+        stats.probing = False
+        log.warning("circuit open", model=model, failures=stats.consecutive_failures, retry_in_s=round(stats.cooldown))
+
+    def health(self) -> dict:
+        now = time.monotonic()
+        models = {}
+        for model in self.order:
+            stats = self.stats[model]
+            self._refresh(stats, now)
+            models[model] = {
+                "state": stats.state,
+                "calls": stats.calls,
+                "success_rate": round(stats.success_rate, 3),
+                "latency_ewma_ms": round(stats.latency_ewma * 1000, 1) if stats.latency_ewma is not None else None,
+                "expected_latency_ms": round(stats.expected_latency() * 1000, 1),
+                "consecutive_failures": stats.consecutive_failures,
+                "recent_errors": [
+                    {"type": error_type, "age_s": round(now - at, 1)} for at, error_type in stats.recent_errors
+                ],
+                "retry_in_s": round(max(stats.opened_at + stats.cooldown - now, 0), 1) if stats.state == OPEN else None,
+            }
+        return {"ranking": self.ranked(), "models": models}
@@ -0,0 +1,78 @@
+"""Torch-free MiniLM embeddings on onnxruntime.
+
+Runs the ONNX export of sentence-transformers/all-MiniLM-L6-v2 (optionally an int8
+quantized variant) with the Rust `tokenizers` package, then applies the same mean
+pooling and L2 normalization as the sentence-transformers pipeline. Importing this
+module and loading the model take a fraction of the time and memory torch needs.
+"""
+import os
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# ONNX file inside the model repo; e.g. onnx/model_quint8_avx2.onnx for the int8 export
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "onnx/model.onnx")
+# Local directory with the model files (skips the Hugging Face download when set)
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", "")
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", "0"))
+# all-MiniLM-L6-v2 truncates inputs at 256 word pieces
+MAX_SEQ_LENGTH = 256
+
+def resolve_model_files(model_name: str, onnx_file: str = EMBED_ONNX_FILE, model_dir: str = EMBED_ONNX_DIR) -> tuple[str, str]:
+    """Paths to (model.onnx, tokenizer.json), downloading them from the Hub if needed"""
+    if model_dir:
+        return os.path.join(model_dir, onnx_file), os.path.join(model_dir, "tokenizer.json")
+
+    from huggingface_hub import hf_hub_download
+
+    return hf_hub_download(model_name, onnx_file), hf_hub_download(model_name, "tokenizer.json")
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(self, model_name: str, onnx_file: str = EMBED_ONNX_FILE, model_dir: str = EMBED_ONNX_DIR,
+                 threads: int = EMBED_ONNX_THREADS, batch_size: int = 64, session=None, tokenizer=None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+        if session is None or tokenizer is None:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+
+            model_path, tokenizer_path = resolve_model_files(model_name, onnx_file, model_dir)
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads:
+                options.intra_op_num_threads = threads
+            session = session or ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            tokenizer = tokenizer or Tokenizer.from_file(tokenizer_path)
+
+        self.session = session
+        self.tokenizer = tokenizer
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        self.input_names = {i.name for i in session.get_inputs()}
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over real tokens, then L2 normalize (as sentence-transformers does)
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text])[0].tolist()
@@ -0,0 +1,133 @@
+"""Server-side project contexts for main_hf.
+
+Reads the roster and each repo's README from the shared GitHub snapshot, then
+precomputes a compact, token-budgeted context per project so clients only need to send
+a project id. The snapshot is refreshed in the background and a project's context is
+only rebuilt when its README actually changes.
+
+With several worker processes, PROJECT_REFRESH_LOCK names a lock file: the worker that
+holds it refreshes from GitHub, and the others reload the snapshot it saves.
+"""
+import os
+import re
+import asyncio
+import hashlib
+from typing import Optional
+
+from context_assembler import count_tokens
+from github_snapshot import GitHubSnapshot
+
+# Token budget for one project's context
+PROJECT_CONTEXT_TOKENS = int(os.getenv("PROJECT_CONTEXT_TOKENS", "600"))
+# Seconds between background README refreshes (0 = only at startup)
+PROJECT_REFRESH_INTERVAL = float(os.getenv("PROJECT_REFRESH_INTERVAL", "3600"))
+# Lock file shared by the worker processes (empty = this process always refreshes)
+PROJECT_REFRESH_LOCK = os.getenv("PROJECT_REFRESH_LOCK", "")
+if PROJECT_REFRESH_LOCK:
+    import fcntl  # POSIX only, like the pre-fork server that needs it
+
+def compact_readme(readme: str) -> str:
+    """Strip markdown noise that costs tokens without helping answers"""
+    text = re.sub(r"<!--.*?-->", "", readme, flags=re.DOTALL)
+    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)          # code blocks
+    text = re.sub(r"\[!\[[^\]]*\]\([^)]*\)\]\([^)]*\)", "", text)    # linked badges
+    text = re.sub(r"!\[[^\]]*\]\([^)]*\)", "", text)                 # images
+    text = re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", text)             # links -> link text
+    text = re.sub(r"<[^>]+>", "", text)                               # html tags
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    return text.strip()
+
+def build_project_context(display_name: str, description: str, readme: str, budget: int = PROJECT_CONTEXT_TOKENS) -> str:
+    """Project header plus as many README paragraphs as fit in the token budget"""
+    parts = [f"Project: {display_name}", f"Description: {description or 'N/A'}"]
+    used = count_tokens("\n".join(parts))
+
+    paragraphs = [p for p in compact_readme(readme).split("\n\n") if p.strip()]
+    kept = []
+    for paragraph in paragraphs:
+        cost = count_tokens(paragraph) + 1
+        if used + cost > budget:
+            remaining = (budget - used) * 4
+            if remaining > 80 and not paragraph.lstrip().startswith("#"):
+                kept.append(paragraph[:remaining].rsplit(" ", 1)[0] + " ...")
+            break
+        kept.append(paragraph)
+        used += cost
+
+    if kept:
+        parts.append("README:\n" + "\n\n".join(kept))
+    return "\n".join(parts)
+
+class ProjectRegistry:
+    def __init__(self, github: Optional[GitHubSnapshot] = None, lock_path: str = PROJECT_REFRESH_LOCK):
+        self.github = github or GitHubSnapshot()
+        self.roster = {p["repo_name"].lower(): p for p in self.github.roster if p.get("repo_name")}
+        self.contexts: dict[str, str] = {}
+        self.readme_hashes: dict[str, str] = {}
+        self.lock_path = lock_path
+        self.leading = not lock_path
+        self._lock_file = None
+        self._sync()
+
+    def get(self, project_id: Optional[str]) -> Optional[str]:
+        if not project_id:
+            return None
+        self._reload()
+        return self.contexts.get(project_id.lower())
+
+    def lead(self) -> bool:
+        """Whether this process should refresh from GitHub. The first worker to take the lock
+        keeps it for life; the OS releases it if that worker dies, and another takes over."""
+        if self.leading:
+            return True
+        lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        self.leading = True
+        return True
+
+    def update(self, repo_name: str, description: str, readme: str) -> bool:
+        """Store a repo's README; rebuilds the context only if it changed. Returns True if rebuilt."""
+        key = repo_name.lower()
+        if key not in self.roster:
+            return False
+        digest = hashlib.sha256(f"{description}\0{readme}".encode("utf-8")).hexdigest()
+        if self.readme_hashes.get(key) == digest:
+            return False
+        self.readme_hashes[key] = digest
+        self.contexts[key] = build_project_context(self.roster[key]["display_name"], description, readme)
+        return True
+
+    async def refresh(self) -> int:
+        """Refresh the GitHub snapshot and rebuild changed contexts. Returns the number rebuilt."""
+        # Blocking HTTP with retries; keep it off the event loop
+        await asyncio.to_thread(self.github.refresh)
+        return self._sync()
+
+    def info(self) -> dict:
+        self._reload()
+        return {
+            key: {
+                "display_name": player["display_name"],
+                "has_context": key in self.contexts,
+                "context_tokens": count_tokens(self.contexts[key]) if key in self.contexts else 0,
+                "oid": (self.github.repo(key) or {}).get("oid"),
+            }
+            for key, player in self.roster.items()
+        }
+
+    def _reload(self):
+        # Another worker refreshes; pick up what it saved
+        if not self.leading and self.github.reload_if_changed():
+            self._sync()
+
+    def _sync(self) -> int:
+        rebuilt = 0
+        for key, repo in list(self.github.repos.items()):
+            rebuilt += self.update(key, repo.get("description", ""), repo.get("readme", ""))
+        return rebuilt
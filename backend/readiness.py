@@ -0,0 +1,67 @@
+"""Startup prewarming and readiness tracking.
+
+Components (embedding model, vector store, LLM client) are loaded in the background at
+startup instead of on the first visitor's request, and each reports its state so a
+/ready probe can hold traffic until the service is warm. Heavy imports are timed so the
+startup log shows where the time goes.
+"""
+import time
+import asyncio
+from contextlib import contextmanager
+from typing import Callable
+
+from logs import get_logger
+
+log = get_logger("Readiness")
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+class Readiness:
+    def __init__(self, components: list[str]):
+        self.components = {name: {"state": PENDING, "ms": None, "error": None} for name in components}
+        self.imports: dict[str, float] = {}
+
+    @contextmanager
+    def import_timer(self, name: str):
+        """Record how long an import block takes (only the first, uncached import is slow)"""
+        start = time.perf_counter()
+        yield
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        if name not in self.imports:
+            self.imports[name] = elapsed
+            log.info("import timed", module=name, ms=elapsed)
+
+    async def warm(self, name: str, load: Callable[[], object]) -> bool:
+        """Run a blocking loader in a worker thread and record the outcome"""
+        component = self.components[name]
+        component["state"] = LOADING
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(load)
+        except Exception as e:
+            component.update(state=FAILED, error=str(e))
+            log.error("prewarm failed", component=name, error=str(e))
+            return False
+        finally:
+            component["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        component["state"] = READY
+        log.info("component ready", component=name, ms=component["ms"])
+        return True
+
+    def mark_ready(self, name: str):
+        if self.components[name]["state"] != READY:
+            self.components[name]["state"] = READY
+
+    def warming(self, *names: str) -> bool:
+        """True while any of these components hasn't finished (or failed) loading"""
+        return any(self.components[name]["state"] in (PENDING, LOADING) for name in names)
+
+    @property
+    def ready(self) -> bool:
+        return all(c["state"] == READY for c in self.components.values())
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "components": self.components, "import_ms": self.imports}
@@ -0,0 +1,159 @@
+"""Single-pass, incremental cleanup of model output.
+
+Removes chat-template tokens ([INST], </s>, <<SYS>>, ...) wherever they appear, role
+labels ("User:", "AI:", "Answer:") and prompt leakage only at the start of a line, and
+echoed question lines after the first line. Leading punctuation is dropped and runs of
+blank lines collapse to one. Text can be fed in arbitrary chunks: whatever could still
+turn into an artifact (a partial token, a line that may be a label or an echoed
+question) is held back until the next chunk decides it, so streamed output matches the
+output for the whole reply at once.
+"""
+import re
+from typing import Optional
+
+# Template tokens are never real text, so they go wherever they appear
+TOKEN_RE = re.compile(r"\[/?(?:INST|USER|SYS)\]|</?s>|<</?SYS>>")
+TOKENS = ["[INST]", "[/INST]", "[USER]", "[/USER]", "[SYS]", "[/SYS]", "<s>", "</s>", "<<SYS>>", "<</SYS>>"]
+TOKEN_HOLDBACK = max(len(t) for t in TOKENS) - 1
+# Every proper prefix of a token, to spot one cut off at the end of a chunk
+TOKEN_PREFIXES = {token[:size] for token in TOKENS for size in range(1, len(token))}
+
+# Role labels and prompt leakage, only at the start of a line ("... in AI: ..." is left alone)
+LABELS = ["Human:", "Assistant:", "User:", "AI:", "ANSWER:", "Answer:", "Response:"]
+LEAK = "answer this question about dixon"
+LEAK_MAX_TAIL = 80
+LINE_START_RE = re.compile(
+    r"[ \t]*(?:(?:Human|Assistant|User|AI|ANSWER|Answer|Response):"
+    rf"|(?i:{LEAK})[^:\n]{{0,{LEAK_MAX_TAIL}}}:)[ \t]*"
+)
+
+# A line that is only a question, e.g. the model echoing the user's message back
+QUESTION_STARTS = ["what", "which", "how", "where", "when", "who", "why", "tell me", "describe", "explain"]
+QUESTION_START_RE = re.compile(rf"(?:{'|'.join(QUESTION_STARTS)})\b", re.IGNORECASE)
+
+LEADING_JUNK = "?!.\n\t "
+
+class Sanitizer:
+    """feed(chunk) returns the text that is safe to show so far; finish() returns the rest"""
+
+    def __init__(self):
+        self.line = ""            # raw text of the current line not emitted yet
+        self.head_done = False    # start-of-line artifacts resolved for the current line
+        self.dropping = False     # current line is an echoed question
+        self.started = False      # something has been emitted
+        self.newlines = 0         # line breaks waiting for the next visible text
+        self.held_ws = ""         # trailing spaces, emitted only if the line continues
+
+    def feed(self, chunk: str) -> str:
+        # Common streaming case: mid-line, nothing held back, no artifact characters
+        if (self.head_done and not self.line and not self.dropping
+                and "\n" not in chunk and "<" not in chunk and "[" not in chunk):
+            return self._emit(chunk)
+
+        lines = (self.line + chunk).split("\n")
+        out = []
+        for line in lines[:-1]:
+            self.line = line
+            out.append(self._process(complete=True))
+            self._end_line()
+        self.line = lines[-1]
+        out.append(self._process(complete=False))
+        return "".join(out)
+
+    def finish(self) -> str:
+        out = self._process(complete=True)
+        self._end_line()
+        self.newlines = 0
+        return out
+
+    def _process(self, complete: bool) -> str:
+        text = self.line
+        cut = len(text)
+        if not complete:
+            # Hold back a possible partial token at the end
+            tail = text[-TOKEN_HOLDBACK:]
+            for i, char in enumerate(tail):
+                if char in "<[" and tail[i:] in TOKEN_PREFIXES:
+                    cut -= len(tail) - i
+                    break
+        available = text[:cut]
+        if "<" in available or "[" in available:
+            available = TOKEN_RE.sub("", available)
+
+        if not self.head_done:
+            decision = self._resolve_head(available, complete)
+            if decision is None:
+                return ""
+            available, self.dropping = decision
+            self.head_done = True
+
+        self.line = text[cut:]
+        if self.dropping:
+            return ""
+        return self._emit(available)
+
+    def _resolve_head(self, text: str, complete: bool) -> Optional[tuple[str, bool]]:
+        """(text without a leading label, drop line?) once the start of the line is unambiguous; None to wait"""
+        rest = text.lstrip(" \t")
+        if not rest:
+            return None if not complete else (text, False)
+
+        lower = rest.lower()
+        if not complete and (any(label.startswith(rest) for label in LABELS) or LEAK.startswith(lower)
+                             or (lower.startswith(LEAK) and ":" not in rest and len(rest) <= len(LEAK) + LEAK_MAX_TAIL)):
+            return None
+        match = LINE_START_RE.match(text)
+        if match:
+            text = rest = text[match.end():]
+            if not rest and not complete:
+                return None
+            lower = rest.lower()
+
+        # Echoed questions are only removed after the first line (a reply can open with one)
+        if self.started:
+            if not complete and any(q.startswith(lower) for q in QUESTION_STARTS):
+                return None
+            if QUESTION_START_RE.match(rest):
+                mark = rest.find("?")
+                # Still a question-only line so far: drop it at the end of the line, wait until then
+                if mark < 0 or not rest[mark + 1:].strip(" \t"):
+                    if not complete:
+                        return None
+                    if mark >= 0:
+                        return text, True
+        return text, False
+
+    def _emit(self, text: str) -> str:
+        if not self.started:
+            text = text.lstrip(LEADING_JUNK)
+            if not text:
+                return ""
+            self.started = True
+            self.newlines = 0
+        body = text.rstrip(" \t")
+        if not body:
+            self.held_ws += text
+            return ""
+        out = "\n" * min(self.newlines, 2) + self.held_ws + body
+        self.newlines = 0
+        self.held_ws = text[len(body):]
+        return out
+
+    def _end_line(self):
+        if self.started and not self.dropping:
+            self.newlines += 1
+        self.line = ""
+        self.head_done = False
+        self.dropping = False
+        self.held_ws = ""
+
+def sanitize(text: str) -> str:
+    sanitizer = Sanitizer()
+    return sanitizer.feed(text) + sanitizer.finish()
+
+def clean_response(answer: str) -> Optional[str]:
+    """Clean up model response - remove artifacts and formatting issues"""
+    if not answer:
+        return None
+    answer = sanitize(answer)
+    return answer if len(answer) > 10 else None
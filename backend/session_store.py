@@ -0,0 +1,216 @@
+"""Server-side conversation memory for main_hf chat sessions.
+
+Each session keeps its latest turns verbatim (answers clipped) within a token budget.
+When a new turn pushes it over, the oldest turns are rolled into a short summary - one
+line per turn, the question and the first sentence of the answer - which is itself
+capped, so the history added to a prompt never grows with the length of a conversation.
+
+Sessions are evicted least-recently-used, after SESSION_TTL seconds of inactivity, and
+when the approximate memory of all sessions passes SESSION_MAX_BYTES. With several
+worker processes, SESSION_DB names a sqlite file every worker reads and writes, so a
+follow-up question finds its session whichever worker it lands on.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from context_assembler import count_tokens
+
+# Seconds of inactivity before a session is dropped
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+# Approximate memory cap for all sessions together, in bytes
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(32 * 1024 * 1024)))
+# Tokens of recent turns kept verbatim, and of rolled-up summary lines
+SESSION_HISTORY_TOKENS = int(os.getenv("SESSION_HISTORY_TOKENS", "300"))
+SESSION_SUMMARY_TOKENS = int(os.getenv("SESSION_SUMMARY_TOKENS", "120"))
+# Path to a sqlite file shared by worker processes (empty = this process only)
+SESSION_DB = os.getenv("SESSION_DB", "")
+
+# Longest question / answer kept for a recent turn, in characters
+MAX_QUESTION_CHARS = 300
+MAX_ANSWER_CHARS = 600
+# Rough per-session and per-string overhead of the objects holding a session
+SESSION_OVERHEAD = 400
+STRING_OVERHEAD = 60
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+# Heads the rolled-up lines in a rendered history (its tokens come out of the summary budget)
+SUMMARY_HEADER = "Earlier (question -> answer):"
+SUMMARY_HEADER_TOKENS = count_tokens(SUMMARY_HEADER)
+
+def clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+def first_sentence(text: str, limit: int = 160) -> str:
+    return clip(SENTENCE_END.split(text.strip(), 1)[0], limit)
+
+class Session:
+    __slots__ = ("summary", "turns", "tokens", "size", "last_seen", "version")
+
+    def __init__(self, summary: Optional[list] = None, turns: Optional[list] = None, version: int = 0):
+        # Summary lines, oldest first, and recent (question, answer, tokens) turns
+        self.summary: list[str] = summary or []
+        self.turns: list[tuple[str, str, int]] = [tuple(turn) for turn in turns or []]
+        self.tokens = sum(turn[2] for turn in self.turns)
+        self.version = version
+        self.last_seen = time.time()
+        self.size = self._size()
+
+    def _size(self) -> int:
+        strings = self.summary + [text for question, answer, _ in self.turns for text in (question, answer)]
+        return SESSION_OVERHEAD + sum(len(text) + STRING_OVERHEAD for text in strings)
+
+    def add(self, question: str, answer: str, history_tokens: int, summary_tokens: int) -> bool:
+        """Append a turn; True if older turns were rolled into the summary"""
+        question, answer = clip(question, MAX_QUESTION_CHARS), clip(answer, MAX_ANSWER_CHARS)
+        # Counted as rendered, labels included, so the budget bounds what the prompt carries
+        turn = (question, answer, count_tokens(f"User: {question}\nAssistant: {answer}"))
+        self.turns.append(turn)
+        self.tokens += turn[2]
+        # Roll the oldest turns into the summary, but always keep the newest verbatim
+        rolled = False
+        while self.tokens > history_tokens and len(self.turns) > 1:
+            old_question, old_answer, tokens = self.turns.pop(0)
+            self.tokens -= tokens
+            self.summary.append(f"{clip(old_question, 100)} -> {first_sentence(old_answer)}")
+            rolled = True
+        if rolled:
+            # count_tokens ignores whitespace, so the rendered summary costs exactly the header
+            # plus its lines
+            counts = [count_tokens(f"- {line}") for line in self.summary]
+            total = SUMMARY_HEADER_TOKENS + sum(counts)
+            while len(self.summary) > 1 and total > summary_tokens:
+                total -= counts.pop(0)
+                self.summary.pop(0)
+        self.version += 1
+        self.size = self._size()
+        return rolled
+
+    def render(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"{SUMMARY_HEADER}\n" + "\n".join(f"- {line}" for line in self.summary))
+        if self.turns:
+            parts.append("\n".join(f"User: {question}\nAssistant: {answer}" for question, answer, _ in self.turns))
+        return "\n\n".join(parts)
+
+    def dump(self) -> str:
+        return json.dumps({"summary": self.summary, "turns": self.turns, "version": self.version})
+
+class SessionStore:
+    def __init__(self, ttl: float = SESSION_TTL, max_sessions: int = SESSION_MAX_SESSIONS,
+                 max_bytes: int = SESSION_MAX_BYTES, history_tokens: int = SESSION_HISTORY_TOKENS,
+                 summary_tokens: int = SESSION_SUMMARY_TOKENS, db_path: str = SESSION_DB):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.history_tokens = history_tokens
+        self.summary_tokens = summary_tokens
+        self.sessions: OrderedDict[str, Session] = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"turns": 0, "rollups": 0, "evictions": 0, "expired": 0}
+
+        self.db_path = db_path
+        self._db = None
+        self._db_pid = None
+        if db_path:
+            self.db.execute("CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+            self.db.commit()
+
+    @property
+    def db(self) -> Optional[sqlite3.Connection]:
+        """This process's connection (forked workers open their own)"""
+        if not self.db_path:
+            return None
+        if self._db_pid != os.getpid():
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db_pid = os.getpid()
+        return self._db
+
+    def history(self, session_id: str) -> str:
+        """The session's budgeted history for a prompt ("" for a new or expired session)"""
+        with self.lock:
+            session = self._get(session_id, time.time())
+            return session.render() if session else ""
+
+    def append(self, session_id: str, question: str, answer: str):
+        now = time.time()
+        with self.lock:
+            session = self._get(session_id, now) or Session()
+            self._remove(session_id)
+            rolled = session.add(question, answer, self.history_tokens, self.summary_tokens)
+            session.last_seen = now
+            self.sessions[session_id] = session
+            self.bytes += session.size
+            self.stats["turns"] += 1
+            self.stats["rollups"] += rolled
+            self._evict(now)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO sessions (id, value, expires_at) VALUES (?, ?, ?)",
+                                (session_id, session.dump(), now + self.ttl))
+                # Expired rows are cleared now and then rather than on every write
+                if self.stats["turns"] % 100 == 0:
+                    self.db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+                self.db.commit()
+
+    def info(self) -> dict:
+        with self.lock:
+            return {
+                **self.stats,
+                "sessions": len(self.sessions),
+                "bytes": self.bytes,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+                "history_tokens": self.history_tokens,
+                "summary_tokens": self.summary_tokens,
+                "ttl_s": self.ttl,
+                "shared": bool(self.db_path),
+            }
+
+    def _get(self, session_id: str, now: float) -> Optional[Session]:
+        self._evict(now)
+        session = self.sessions.get(session_id)
+        if session is not None and now - session.last_seen > self.ttl:
+            self._remove(session_id)
+            self.stats["expired"] += 1
+            session = None
+        if self.db is not None:
+            # Another worker may have added turns since this one last saw the session
+            row = self.db.execute("SELECT value, expires_at FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row and row[1] > now:
+                stored = json.loads(row[0])
+                if session is None or stored["version"] > session.version:
+                    self._remove(session_id)
+                    session = Session(stored["summary"], stored["turns"], stored["version"])
+                    self.sessions[session_id] = session
+                    self.bytes += session.size
+        if session is not None:
+            session.last_seen = now
+            self.sessions.move_to_end(session_id)
+        return session
+
+    def _evict(self, now: float):
+        """Oldest first: expired sessions, then whatever is over the count or memory cap"""
+        while self.sessions:
+            oldest_id, oldest = next(iter(self.sessions.items()))
+            if now - oldest.last_seen > self.ttl:
+                self.stats["expired"] += 1
+            elif len(self.sessions) > self.max_sessions or self.bytes > self.max_bytes:
+                self.stats["evictions"] += 1
+            else:
+                break
+            self._remove(oldest_id)
+
+    def _remove(self, session_id: str):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.bytes -= session.size
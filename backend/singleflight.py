@@ -0,0 +1,47 @@
+"""Request coalescing for identical in-flight upstream calls.
+
+Concurrent callers with the same key share one running call and all receive its result
+(or its exception). The shared call is only cancelled once every caller waiting on it
+has gone away, so one client disconnecting never breaks the others.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        self.calls: dict[str, _Call] = {}
+        self.stats = {"leaders": 0, "followers": 0, "abandoned": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self.calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self.calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["followers"] += 1
+
+        call.waiters += 1
+        try:
+            # shield: a cancelled caller must not cancel the call everyone else is waiting on
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller left - stop the upstream work
+                self._forget(key, call)
+                call.task.cancel()
+                self.stats["abandoned"] += 1
+
+    def _forget(self, key: str, call: _Call):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+    def info(self) -> dict:
+        return {**self.stats, "in_flight": len(self.calls)}
@@ -0,0 +1,187 @@
+"""In-process vector index, an alternative to Pinecone for small corpora.
+
+Embeddings are stored L2-normalized as float32 (or int8 with a per-vector scale) in a
+memory-mapped .npy file next to a JSON sidecar holding ids, texts and metadata. Each
+write produces a new version directory and flips a CURRENT pointer with an atomic
+rename, so readers (including other processes) always see a complete index. Search is a
+single matrix-vector product plus argpartition - no network involved.
+"""
+import os
+import json
+import time
+import shutil
+from typing import Iterable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+# Version directories kept on disk: the current one plus the one before it, which a
+# process that read CURRENT just before a swap may still be opening
+KEEP_VERSIONS = 2
+
+class LocalVectorStore(VectorStore):
+    def __init__(self, path: str, embedding, quantize: bool = False):
+        self.path = path
+        self.embedding = embedding
+        self.quantize = quantize
+        self.version = None
+        # (matrix, scales, ids, texts, metadatas) - replaced as a whole on swap
+        self._index = (np.zeros((0, 0), dtype=np.float32), None, [], [], [])
+        os.makedirs(path, exist_ok=True)
+        self._maybe_reload()
+
+    @property
+    def embeddings(self):
+        return self.embedding
+
+    # --- storage ---
+
+    def _current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.path, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _maybe_reload(self, attempts: int = 3):
+        for attempt in range(attempts):
+            version = self._current_version()
+            if version is None or version == self.version:
+                return
+            directory = os.path.join(self.path, version)
+            try:
+                with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                matrix = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+                scales = np.load(os.path.join(directory, "scales.npy")) if meta.get("quantized") else None
+            except FileNotFoundError:
+                # Pruned by writes that landed while we read; CURRENT points somewhere newer now
+                if attempt + 1 == attempts:
+                    raise
+                continue
+            self._index = (matrix, scales, meta["ids"], meta["texts"], meta["metadatas"])
+            self.version = version
+            return
+
+    def _write(self, vectors: np.ndarray, ids: list, texts: list, metadatas: list):
+        """Write a new version and atomically point CURRENT at it"""
+        version = f"v{time.time_ns()}"
+        directory = os.path.join(self.path, version)
+        os.makedirs(directory)
+
+        scales = None
+        if self.quantize and len(vectors):
+            scales = np.abs(vectors).max(axis=1).astype(np.float32)
+            scales[scales == 0] = 1.0
+            matrix = np.round(vectors / scales[:, None] * 127).astype(np.int8)
+            np.save(os.path.join(directory, "scales.npy"), scales)
+        else:
+            matrix = vectors.astype(np.float32)
+        np.save(os.path.join(directory, "vectors.npy"), matrix)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"ids": ids, "texts": texts, "metadatas": metadatas, "quantized": scales is not None}, f)
+
+        tmp_pointer = os.path.join(self.path, "CURRENT.tmp")
+        with open(tmp_pointer, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_pointer, os.path.join(self.path, "CURRENT"))
+        self._maybe_reload()
+
+        # Older versions stay readable for anyone who already mapped them (POSIX), so they can go now
+        versions = sorted((name for name in os.listdir(self.path) if name.startswith("v")), key=lambda n: int(n[1:]))
+        for name in versions[:-KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def _dense(self) -> np.ndarray:
+        matrix, scales, *_ = self._index
+        if scales is None:
+            return np.asarray(matrix, dtype=np.float32)
+        return matrix.astype(np.float32) * (scales[:, None] / 127)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def count(self) -> int:
+        """Vectors in the current version"""
+        self._maybe_reload()
+        return len(self._index[2])
+
+    # --- VectorStore interface ---
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [f"{time.time_ns()}-{i}" for i in range(len(texts))]
+        new_vectors = self._normalize(np.asarray(self.embedding.embed_documents(texts), dtype=np.float32))
+
+        self._maybe_reload()
+        _, _, old_ids, old_texts, old_metas = self._index
+        replaced = set(ids)
+        keep = [i for i, cid in enumerate(old_ids) if cid not in replaced]
+        old_vectors = self._dense()[keep] if keep else np.zeros((0, new_vectors.shape[1]), dtype=np.float32)
+
+        self._write(
+            np.vstack([old_vectors, new_vectors]),
+            [old_ids[i] for i in keep] + list(ids),
+            [old_texts[i] for i in keep] + texts,
+            [old_metas[i] for i in keep] + list(metadatas),
+        )
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, **kwargs) -> Optional[bool]:
+        self._maybe_reload()
+        _, _, old_ids, old_texts, old_metas = self._index
+        if delete_all:
+            keep = []
+        else:
+            removed = set(ids or [])
+            keep = [i for i, cid in enumerate(old_ids) if cid not in removed]
+            if len(keep) == len(old_ids):
+                return True
+        dim = self._index[0].shape[1] if self._index[0].ndim == 2 else 0
+        vectors = self._dense()[keep] if keep else np.zeros((0, dim), dtype=np.float32)
+        self._write(vectors, [old_ids[i] for i in keep], [old_texts[i] for i in keep], [old_metas[i] for i in keep])
+        return True
+
+    def similarity_search_by_vector_with_score(self, embedding: List[float], k: int = 4) -> List[tuple[Document, float]]:
+        self._maybe_reload()
+        matrix, scales, ids, texts, metadatas = self._index
+        if not ids:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+
+        scores = matrix @ query if scales is None else (matrix @ query) * (scales / 127)
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (Document(page_content=texts[i], metadata={**metadatas[i], "id": ids[i]}), float(scores[i]))
+            for i in top
+        ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, path: str = "data/vector_index", **kwargs) -> "LocalVectorStore":
+        store = cls(path, embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids)
+        return store
@@ -1,5 +1,5 @@
 "use client";
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import { API_CHAT_ENDPOINT } from '@/config/api';
 
 export default function GlobalChat() {
@@ -7,6 +7,8 @@ export default function GlobalChat() {
     const [messages, setMessages] = useState<{ role: string, content: string }[]>([]);
     const [isLoading, setIsLoading] = useState(false);
     const [isExpanded, setIsExpanded] = useState(false);
+    // Server-side chat session (created on first message), so follow-up questions keep their context
+    const sessionId = useRef<string | null>(null);
 
     const handleSubmit = async (e: React.FormEvent) => {
         e.preventDefault();
@@ -21,7 +23,7 @@ export default function GlobalChat() {
             const res = await fetch(API_CHAT_ENDPOINT, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message: input })
+                body: JSON.stringify({ message: input, session_id: (sessionId.current ??= crypto.randomUUID()) })
             });
             const data = await res.json();
             setMessages([...newMessages, { role: 'assistant', content: data.response }]);
@@ -65,6 +65,14 @@ interface FolderItem {
     children: (FileItem | FolderItem)[];
 }
 
+// The backend resolves project_id to its own copy of the README; this short context is only
+// used when it doesn't know the project
+const FALLBACK_DESCRIPTION_CHARS = 300;
+
+function projectFallbackContext(project: any, description: string): string {
+    return `Project: ${project.display_name}. Description: ${description.slice(0, FALLBACK_DESCRIPTION_CHARS)}.`;
+}
+
 export default function VSCodePortfolio({ qbData, rosterData, aboutText, experiences, education, skills }: VSCodePortfolioProps) {
     // State
     const [activeTab, setActiveTab] = useState('welcome.md');
@@ -79,6 +87,9 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
     const [projectChatInput, setProjectChatInput] = useState('');
     const [projectChatHistory, setProjectChatHistory] = useState<{ role: string; content: string }[]>([]);
     const terminalRef = useRef<HTMLDivElement>(null);
+    // Server-side chat sessions (created on first message), so follow-up questions keep their context
+    const terminalSessionId = useRef<string | null>(null);
+    const projectSessionId = useRef<string | null>(null);
 
     // Search sidebar state
     const [searchQuery, setSearchQuery] = useState('');
@@ -343,6 +354,7 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
         // Clear chat history and fetch AI summary when opening a new project tab
         if (fileId.startsWith('project-')) {
             setProjectChatHistory([]);
+            projectSessionId.current = null;
             const projectId = fileId.replace('project-', '');
             const project = rosterData.find(p => String(p.position) === projectId);
             if (project) {
@@ -374,7 +386,7 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
             const res = await fetch(API_CHAT_ENDPOINT, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ message: userMsg })
+                body: JSON.stringify({ message: userMsg, session_id: (terminalSessionId.current ??= crypto.randomUUID()) })
             });
             const data = await res.json();
             setTerminalHistory(prev => [...prev, { role: 'assistant', content: data.response }]);
@@ -520,7 +532,6 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
         setProjectAiSummary('');
 
         try {
-            const readmeSnippet = project.stats?.readme?.slice(0, 4000) || '';
             const projectDescription = project.stats?.description || project.display_name;
 
             const res = await fetch(API_CHAT_ENDPOINT, {
@@ -528,7 +539,8 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     message: `Summarize this project in 2-3 sentences, highlighting its purpose and key technologies: ${projectDescription}`,
-                    project_context: `Project: ${project.display_name}. Description: ${projectDescription}. README: ${readmeSnippet}`
+                    project_id: project.repo_name,
+                    project_context: projectFallbackContext(project, projectDescription)
                 })
             });
             const data = await res.json();
@@ -1443,7 +1455,9 @@ export default function VSCodePortfolio({ qbData, rosterData, aboutText, experie
                                                             headers: { 'Content-Type': 'application/json' },
                                                             body: JSON.stringify({
                                                                 message: msg,
-                                                                project_context: `Project: ${project.display_name}. Description: ${project.stats?.description || ''}. README: ${project.stats?.readme?.slice(0, 4000) || ''}`
+                                                                project_id: project.repo_name,
+                                                                project_context: projectFallbackContext(project, project.stats?.description || ''),
+                                                                session_id: (projectSessionId.current ??= crypto.randomUUID())
                                                             })
                                                         });
                                                         const data = await res.json();